@@ -14,20 +14,26 @@ from app.database import Base
 from app.models import *  # noqa: Import all models so Alembic can detect them
 from app.config import get_settings
 
-settings = get_settings()
-
 config = context.config
 
-# Override sqlalchemy.url with env var
-config.set_main_option("sqlalchemy.url", settings.sync_database_url)
+target_metadata = Base.metadata
 
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
 
-target_metadata = Base.metadata
+def _bootstrap() -> None:
+    """Configure logging and the DB URL right before migrations run.
+
+    Kept out of module import so tooling that merely imports env.py
+    (e.g. pytest-alembic) doesn't re-parse logging config or settings.
+    """
+    # Override sqlalchemy.url with env var
+    config.set_main_option("sqlalchemy.url", get_settings().sync_database_url)
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
 
 
 def run_migrations_offline() -> None:
+    _bootstrap()
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
@@ -41,6 +47,7 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
+    _bootstrap()
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -48,9 +55,14 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # One transaction per revision instead of one for the whole upgrade.
+        # Data migrations on large tables should additionally page through
+        # rows with app.utils.migrations.iter_id_batches() and commit each
+        # batch in context.autocommit_block().
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -18,6 +18,9 @@ branch_labels: Union[str, Sequence[str], None] = ${repr(branch_labels)}
 depends_on: Union[str, Sequence[str], None] = ${repr(depends_on)}
 
 
+# Large data migrations: see app.utils.migrations.iter_id_batches()
+
+
 def upgrade() -> None:
     ${upgrades if upgrades else "pass"}
 
@@ -0,0 +1,42 @@
+"""page number and section order indexes
+
+Revision ID: 0a4c7e9b2d16
+Revises: f1a6b8d2e305
+Create Date: 2026-10-14 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4c7e9b2d16'
+down_revision: Union[str, None] = 'f1a6b8d2e305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_pages_book_page_number", "pages", ["book_id", "page_number"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_sections_page_sort", "sections", ["page_id", "sort_order"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sections_page_sort", table_name="sections",
+            if_exists=True, postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_pages_book_page_number", table_name="pages",
+            if_exists=True, postgresql_concurrently=True,
+        )
@@ -0,0 +1,48 @@
+"""text unit, section and page version indexes
+
+Revision ID: 3f1c2a7d9b10
+Revises:
+Create Date: 2026-10-14 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables themselves are created by Base.metadata.create_all() at startup,
+# which also creates these indexes on a fresh database — hence if_not_exists.
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_text_units_page_sort", "text_units", ["page_id", "sort_order"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_text_units_page_auto", "text_units", ["page_id"],
+        postgresql_where=sa.text("is_manual = false"), if_not_exists=True,
+    )
+    op.create_index(
+        "ix_sections_page_auto", "sections", ["page_id"],
+        postgresql_where=sa.text("is_manual = false"), if_not_exists=True,
+    )
+    op.create_index(
+        "ix_page_versions_page_version", "page_versions", ["page_id", sa.text("version DESC")],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_page_versions_page_version", table_name="page_versions", if_exists=True)
+    op.drop_index("ix_sections_page_auto", table_name="sections", if_exists=True)
+    op.drop_index("ix_text_units_page_auto", table_name="text_units", if_exists=True)
+    op.drop_index("ix_text_units_page_sort", table_name="text_units", if_exists=True)
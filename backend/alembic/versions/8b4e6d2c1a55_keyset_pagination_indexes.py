@@ -0,0 +1,36 @@
+"""keyset pagination indexes for audit log and feedback
+
+Revision ID: 8b4e6d2c1a55
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-14 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e6d2c1a55'
+down_revision: Union[str, None] = '3f1c2a7d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_audit_logs_created_id", "audit_logs",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_feedback_submissions_created_id", "feedback_submissions",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feedback_submissions_created_id", table_name="feedback_submissions", if_exists=True)
+    op.drop_index("ix_audit_logs_created_id", table_name="audit_logs", if_exists=True)
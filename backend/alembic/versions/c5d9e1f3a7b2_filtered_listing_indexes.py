@@ -0,0 +1,45 @@
+"""filtered listing indexes for audit log and feedback
+
+Revision ID: c5d9e1f3a7b2
+Revises: 8b4e6d2c1a55
+Create Date: 2026-10-14 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d9e1f3a7b2'
+down_revision: Union[str, None] = '8b4e6d2c1a55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_audit_logs_action_created_id", "audit_logs",
+            ["action", sa.text("created_at DESC"), sa.text("id DESC")],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_feedback_submissions_type_created_id", "feedback_submissions",
+            ["feedback_type", sa.text("created_at DESC"), sa.text("id DESC")],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_feedback_submissions_type_created_id", table_name="feedback_submissions",
+            if_exists=True, postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_audit_logs_action_created_id", table_name="audit_logs",
+            if_exists=True, postgresql_concurrently=True,
+        )
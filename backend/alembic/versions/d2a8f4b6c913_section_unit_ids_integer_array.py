@@ -0,0 +1,59 @@
+"""store sections.unit_ids as integer[]
+
+Revision ID: d2a8f4b6c913
+Revises: c5d9e1f3a7b2
+Create Date: 2026-10-14 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f4b6c913'
+down_revision: Union[str, None] = 'c5d9e1f3a7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _unit_ids_is_array() -> bool:
+    columns = sa.inspect(op.get_bind()).get_columns("sections")
+    return any(
+        c["name"] == "unit_ids" and isinstance(c["type"], postgresql.ARRAY)
+        for c in columns
+    )
+
+
+def upgrade() -> None:
+    # Tables created by create_all after this model change already have it
+    if _unit_ids_is_array():
+        return
+
+    # ALTER ... USING can't take a subquery, so copy through a new column
+    op.add_column(
+        "sections",
+        sa.Column("unit_ids_arr", postgresql.ARRAY(sa.Integer), nullable=False, server_default="{}"),
+    )
+    # json_array_elements_text raises on scalars (e.g. a JSON null), so
+    # only arrays are unpacked; everything else becomes an empty array
+    op.execute(
+        "UPDATE sections SET unit_ids_arr = ARRAY("
+        "SELECT e::int FROM json_array_elements_text(unit_ids) WITH ORDINALITY AS t(e, n) "
+        "ORDER BY n) "
+        "WHERE json_typeof(unit_ids) = 'array'"
+    )
+    op.execute(
+        "UPDATE sections SET unit_ids_arr = '{}' "
+        "WHERE unit_ids IS NULL OR json_typeof(unit_ids) <> 'array'"
+    )
+    op.drop_column("sections", "unit_ids")
+    op.alter_column("sections", "unit_ids_arr", new_column_name="unit_ids", server_default=None)
+
+
+def downgrade() -> None:
+    if not _unit_ids_is_array():
+        return
+    op.execute("ALTER TABLE sections ALTER COLUMN unit_ids TYPE json USING to_json(unit_ids)")
@@ -0,0 +1,42 @@
+"""manifest counters on books
+
+Revision ID: e7b3c9a1d480
+Revises: d2a8f4b6c913
+Create Date: 2026-10-14 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9a1d480'
+down_revision: Union[str, None] = 'd2a8f4b6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ("pages_count", "units_count", "segments_count")
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("books")}
+    for name in COUNTERS:
+        if name not in existing:
+            op.add_column("books", sa.Column(name, sa.Integer(), server_default="0"))
+
+    # Backfill; afterwards the counters are refreshed on every publish
+    op.execute(
+        "UPDATE books SET "
+        "pages_count = (SELECT count(*) FROM pages WHERE pages.book_id = books.id), "
+        "units_count = (SELECT count(*) FROM text_units WHERE text_units.page_id IN "
+        "(SELECT pages.id FROM pages WHERE pages.book_id = books.id)), "
+        "segments_count = (SELECT count(*) FROM unit_segment_mappings "
+        "WHERE unit_segment_mappings.is_published)"
+    )
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column("books", name)
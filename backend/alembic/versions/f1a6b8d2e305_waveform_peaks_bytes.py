@@ -0,0 +1,89 @@
+"""store waveform_peaks as one byte per peak
+
+Revision ID: f1a6b8d2e305
+Revises: e7b3c9a1d480
+Create Date: 2026-10-14 18:00:00
+
+"""
+import json
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import iter_id_batches
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6b8d2e305'
+down_revision: Union[str, None] = 'e7b3c9a1d480'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("audio_files", "audio_segments")
+
+
+def _columns(table: str) -> dict:
+    return {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _is_binary(table: str) -> bool:
+    column = _columns(table).get("waveform_peaks")
+    return column is not None and isinstance(column["type"], sa.LargeBinary)
+
+
+def _swap_column(table: str, new_type, convert) -> None:
+    """Copy waveform_peaks through convert() into a new column and swap it in.
+
+    Rows are converted one id batch at a time, each batch committed on its
+    own (autocommit_block), so locks are held for a batch, not the whole
+    run. If the run stops midway, running the migration again resumes:
+    the new column is kept and rows that are already converted are skipped.
+    """
+    ctx = op.get_context()
+    bind = op.get_bind()
+    if "waveform_peaks_new" not in _columns(table):
+        op.add_column(table, sa.Column("waveform_peaks_new", new_type, nullable=True))
+    rows_table = sa.table(table, sa.column("id"))
+    select_batch = sa.text(
+        f"SELECT id, waveform_peaks FROM {table} "
+        f"WHERE id IN :ids AND waveform_peaks IS NOT NULL AND waveform_peaks_new IS NULL"
+    ).bindparams(sa.bindparam("ids", expanding=True))
+    update_row = sa.text(f"UPDATE {table} SET waveform_peaks_new = :value WHERE id = :id")
+    for ids in iter_id_batches(bind, rows_table):
+        with ctx.autocommit_block():
+            values = [
+                {"id": row_id, "value": convert(value)}
+                for row_id, value in bind.execute(select_batch, {"ids": ids})
+            ]
+            # NULL results (see _pack) are left as SQL NULL
+            values = [v for v in values if v["value"] is not None]
+            if values:
+                # One executemany per batch
+                bind.execute(update_row, values)
+    op.drop_column(table, "waveform_peaks")
+    op.alter_column(table, "waveform_peaks_new", new_column_name="waveform_peaks")
+
+
+def _pack(value) -> Optional[bytes]:
+    peaks = json.loads(value) if isinstance(value, str) else value
+    if peaks is None:
+        # A JSON null stays NULL instead of becoming an empty byte string
+        return None
+    return bytes(round(min(1.0, max(0.0, float(p))) * 255) for p in peaks)
+
+
+def _unpack(value) -> str:
+    return json.dumps([round(b / 255, 4) for b in bytes(value)])
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        if not _is_binary(table):
+            _swap_column(table, sa.LargeBinary(), _pack)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if _is_binary(table):
+            _swap_column(table, sa.JSON(), _unpack)
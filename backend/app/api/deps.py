@@ -1,5 +1,8 @@
 """API dependency functions."""
 
+from types import MappingProxyType
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,26 +11,31 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models.admin import AdminUser
 from app.models.book import Book, UnitType
-from app.utils import decode_access_token
+from app.utils import decode_access_token_async
 
 security = HTTPBearer()
 
-# Shared constant — used in image analysis, bulk unit updates, and rollback
-UNIT_TYPE_MAP = {
+# Shared constant — used in image analysis, bulk unit updates, and rollback.
+# Read-only views, built once at import.
+UNIT_TYPE_MAP = MappingProxyType({
     "letter": UnitType.LETTER,
     "word": UnitType.WORD,
     "sentence": UnitType.SENTENCE,
     "drill_group": UnitType.DRILL_GROUP,
     "divider": UnitType.DIVIDER,
-}
+})
+# UnitType -> API string, for serializing units without hasattr/.value checks
+UNIT_TYPE_MAP_INV = MappingProxyType({v: k for k, v in UNIT_TYPE_MAP.items()})
 
+# Id of the single book once get_any_book has resolved it. Only the id is
+# kept: every request loads the row on its own session (a primary-key get),
+# so no ORM instance is shared between requests.
+_book_id: Optional[int] = None
 
-async def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> AdminUser:
-    """Dependency: extract and validate admin from JWT token."""
-    payload = decode_access_token(credentials.credentials)
+
+async def _credentials_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Validate the bearer token and return its claims or raise 401."""
+    payload = await decode_access_token_async(credentials.credentials)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,15 +43,23 @@ async def get_current_admin(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    username = payload.get("sub")
-    if not username:
+    if not payload.get("sub"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token yaroqsiz",
         )
+    return payload
+
+
+async def get_current_admin_fresh(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> AdminUser:
+    """Dependency: validate JWT and load the live admin row from the database."""
+    payload = await _credentials_payload(credentials)
 
     result = await db.execute(
-        select(AdminUser).where(AdminUser.username == username)
+        select(AdminUser).where(AdminUser.username == payload["sub"])
     )
     admin = result.scalar_one_or_none()
     if not admin:
@@ -55,6 +71,25 @@ async def get_current_admin(
     return admin
 
 
+async def get_current_admin(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> AdminUser:
+    """Dependency: extract and validate admin from JWT token.
+
+    Tokens carry the admin id in the "uid" claim, so no query is needed.
+    The returned AdminUser is transient (not attached to the session).
+    Older tokens without "uid" fall back to a database lookup.
+    """
+    payload = await _credentials_payload(credentials)
+
+    uid = payload.get("uid")
+    if uid is None:
+        return await get_current_admin_fresh(credentials, db)
+
+    return AdminUser(id=uid, username=payload["sub"])
+
+
 async def get_published_book(db: AsyncSession = Depends(get_db)) -> Book:
     """Dependency: get the single published book or raise 404."""
     result = await db.execute(
@@ -68,8 +103,13 @@ async def get_published_book(db: AsyncSession = Depends(get_db)) -> Book:
 
 async def get_any_book(db: AsyncSession = Depends(get_db)) -> Book:
     """Dependency: get the single book (admin context, any status) or raise 404."""
-    result = await db.execute(select(Book).limit(1))
-    book = result.scalar_one_or_none()
+    global _book_id
+
+    book = await db.get(Book, _book_id) if _book_id is not None else None
+    if book is None:
+        result = await db.execute(select(Book).limit(1))
+        book = result.scalar_one_or_none()
     if not book:
         raise HTTPException(status_code=404, detail="Kitob topilmadi")
+    _book_id = book.id
     return book
@@ -4,7 +4,7 @@ import os
 import shutil
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -14,8 +14,8 @@ from app.api.deps import get_current_admin
 from app.models.admin import AdminUser
 from app.models.audio import AudioFile, AudioSegment, UnitSegmentMapping, AudioStatus
 from app.models.book import TextUnit
-from app.models.system import AuditLog
 from app.schemas.audio import AudioFileOut, AudioSegmentOut, AudioSegmentUpdate, SegmentMappingCreate, SegmentMappingOut
+from app.services.audit import write_audit_log
 from app.config import get_settings
 from app.utils.validators import validate_file_extension, sanitize_filename
 
@@ -25,6 +25,7 @@ settings = get_settings()
 
 @router.post("/upload", response_model=AudioFileOut, status_code=201)
 async def upload_audio(
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     book_id: int = Form(...),
     page_start: int = Form(None),
@@ -71,13 +72,11 @@ async def upload_audio(
     from app.tasks.audio_tasks import process_audio_task
     task = process_audio_task.delay(audio_file.id)
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="upload_audio",
-        entity_type="audio_file",
-        entity_id=audio_file.id,
+    background.add_task(
+        write_audit_log, admin.id, "upload_audio",
+        entity_type="audio_file", entity_id=audio_file.id,
         details={"filename": file.filename, "task_id": task.id},
-    ))
+    )
 
     return AudioFileOut(
         id=audio_file.id,
@@ -155,6 +154,7 @@ async def get_segments(
 async def update_segment(
     segment_id: int,
     data: AudioSegmentUpdate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -171,7 +171,10 @@ async def update_segment(
         seg.duration_ms = seg.end_ms - seg.start_ms
 
     await db.flush()
-    db.add(AuditLog(admin_id=admin.id, action="update", entity_type="audio_segment", entity_id=segment_id))
+    background.add_task(
+        write_audit_log, admin.id, "update",
+        entity_type="audio_segment", entity_id=segment_id,
+    )
 
     return AudioSegmentOut(
         id=seg.id,
@@ -192,6 +195,7 @@ async def update_segment(
 @router.post("/mappings", response_model=SegmentMappingOut, status_code=201)
 async def create_mapping(
     data: SegmentMappingCreate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -209,13 +213,14 @@ async def create_mapping(
     db.add(mapping)
     await db.flush()
 
-    db.add(AuditLog(admin_id=admin.id, action="create", entity_type="mapping", entity_id=mapping.id))
+    background.add_task(write_audit_log, admin.id, "create", entity_type="mapping", entity_id=mapping.id)
     return mapping
 
 
 @router.delete("/mappings/{mapping_id}")
 async def delete_mapping(
     mapping_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -224,13 +229,14 @@ async def delete_mapping(
     if not mapping:
         raise HTTPException(status_code=404, detail="Mapping topilmadi")
     await db.delete(mapping)
-    db.add(AuditLog(admin_id=admin.id, action="delete", entity_type="mapping", entity_id=mapping_id))
+    background.add_task(write_audit_log, admin.id, "delete", entity_type="mapping", entity_id=mapping_id)
     return {"message": "Mapping o'chirildi"}
 
 
 @router.post("/files/{audio_file_id}/cut-segments")
 async def cut_segments(
     audio_file_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -242,12 +248,9 @@ async def cut_segments(
     from app.tasks.audio_tasks import cut_segments_task
     task = cut_segments_task.delay(audio_file_id)
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="cut_segments",
-        entity_type="audio_file",
-        entity_id=audio_file_id,
-        details={"task_id": task.id},
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "cut_segments",
+        entity_type="audio_file", entity_id=audio_file_id, details={"task_id": task.id},
+    )
 
     return {"message": "Segmentlar kesish boshlandi", "task_id": task.id}
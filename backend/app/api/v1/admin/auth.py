@@ -1,40 +1,91 @@
 """Admin authentication endpoints."""
 
-from datetime import datetime, timezone
+import asyncio
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.admin import AdminUser
 from app.schemas.admin import AdminLogin, AdminTokenOut
+from app.services.cache import cache_delete, get_redis
 from app.utils import verify_password, create_access_token
 from app.config import get_settings
 
+logger = logging.getLogger("muallimi")
 router = APIRouter(prefix="/auth", tags=["Admin Auth"])
 settings = get_settings()
 
+# Failed logins per (username, client_ip), counted in Redis so the limit
+# holds across workers and each counter expires on its own. Checked before
+# the DB lookup and bcrypt so brute-force loops are rejected cheaply.
+MAX_FAILED_LOGINS = 5
+FAILED_LOGIN_WINDOW = 300  # seconds, from the latest failure
+
+
+def _failed_login_key(username: str, client_ip: str) -> str:
+    return f"login_fail:{client_ip}:{username}"
+
+
+async def _failed_login_count(key: str) -> int:
+    # A down Redis doesn't lock admins out; RateLimitMiddleware still caps
+    # login attempts per IP (with its in-memory fallback)
+    try:
+        return int(await get_redis().get(key) or 0)
+    except Exception as e:
+        logger.warning(f"Failed-login check skipped: {e}")
+        return 0
+
+
+async def _record_failed_login(key: str) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        pipe.incr(key)
+        pipe.expire(key, FAILED_LOGIN_WINDOW)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed-login record skipped: {e}")
+
 
 @router.post("/login", response_model=AdminTokenOut)
-async def admin_login(data: AdminLogin, db: AsyncSession = Depends(get_db)):
+async def admin_login(
+    data: AdminLogin,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
     """Authenticate admin and return JWT token."""
+    client_ip = request.client.host if request.client else "unknown"
+    key = _failed_login_key(data.username, client_ip)
+    if await _failed_login_count(key) >= MAX_FAILED_LOGINS:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Juda ko'p muvaffaqiyatsiz urinishlar. Biroz kuting.",
+        )
+
     result = await db.execute(
         select(AdminUser).where(AdminUser.username == data.username)
     )
     admin = result.scalar_one_or_none()
 
-    if not admin or not verify_password(data.password, admin.password_hash):
+    # bcrypt is deliberately slow — keep it off the event loop
+    if not admin or not await asyncio.to_thread(
+        verify_password, data.password, admin.password_hash
+    ):
+        await _record_failed_login(key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Noto'g'ri foydalanuvchi nomi yoki parol",
         )
 
-    # Update last login
-    admin.last_login = datetime.now(timezone.utc)
-    await db.flush()
+    await cache_delete(key)
+
+    # Update last login — the DB clock stamps it; the UPDATE goes out with
+    # get_db's commit instead of an extra flush here
+    admin.last_login = func.now()
 
-    token = create_access_token(data={"sub": admin.username})
+    token = create_access_token(data={"sub": admin.username, "uid": admin.id})
 
     return AdminTokenOut(
         access_token=token,
@@ -1,46 +1,144 @@
 """Admin book management endpoints."""
 
+import asyncio
+import logging
 import os
 import shutil
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body
-from sqlalchemy import select, delete, update, func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Body
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select, insert, delete, update, func, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload, raiseload
 
-from app.database import get_db
-from app.api.deps import get_current_admin, get_any_book, UNIT_TYPE_MAP
+from app.database import get_db, AsyncSessionLocal
+from app.api.deps import (
+    get_current_admin, get_any_book,
+    UNIT_TYPE_MAP, UNIT_TYPE_MAP_INV,
+)
 from app.models.admin import AdminUser
 from app.models.book import Book, Chapter, Page, TextUnit, UnitType, PageStatus, PageVersion
-from app.models.system import AuditLog
 from app.schemas import (
     BookOut, ChapterCreate, ChapterOut,
-    PageOut, TextUnitCreate, TextUnitUpdate, TextUnitOut,
+    PageOut, TextUnitCreate, TextUnitUpdate, TextUnitOut, TEXT_UNIT_LIST_ADAPTER,
+)
+from app.services.audit import write_audit_log
+from app.services.manifest import manifest_counter_values
+from app.utils.validators import sniff_image_type
+from app.services.cache import (
+    cache_get, cache_set, cache_delete, dump_json, pages_key, versions_key,
 )
 from app.config import get_settings
 
 router = APIRouter(prefix="/book", tags=["Admin Book"])
+logger = logging.getLogger("muallimi")
 settings = get_settings()
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB copy buffer (shutil default is 64 KiB)
+IMAGE_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "webp"})
+
+
+def _copy_upload(file: UploadFile, path: str) -> None:
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f, length=UPLOAD_CHUNK_SIZE)
+
+
+async def _save_upload(file: UploadFile, path: str) -> None:
+    """Write an uploaded file to disk without blocking the event loop."""
+    await asyncio.to_thread(_copy_upload, file, path)
+
+
+# Unit fields taken as-is from client payloads and version snapshots
+_UNIT_ROW_DEFAULTS = {
+    "text_content": "",
+    "bbox_x": 0, "bbox_y": 0, "bbox_w": 0, "bbox_h": 0,
+    "sort_order": 0,
+}
+
+
+def _unit_row(data: dict, **columns) -> dict:
+    """Build a TextUnit insert row: defaults, then fields present in data, then columns."""
+    row = _UNIT_ROW_DEFAULTS | {k: data[k] for k in data.keys() & _UNIT_ROW_DEFAULTS.keys()}
+    row.update(columns)
+    return row
+
+
+def _image_size(path: str) -> tuple[int, int]:
+    """Read image dimensions from the file header (PIL opens lazily, no decode)."""
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+
+async def _invalidate_pages_of(db: AsyncSession, background: BackgroundTasks, page_id: int) -> None:
+    """Drop the cached pages list of the book that owns page_id, after commit."""
+    book_id = await db.scalar(select(Page.book_id).where(Page.id == page_id))
+    if book_id is not None:
+        background.add_task(cache_delete, pages_key(book_id))
+
 
 @router.get("", response_model=BookOut)
 async def admin_get_book(
-    book: Book = Depends(get_any_book),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Get full book details for admin."""
-    # Reload with chapters eagerly loaded
+    # Load the book and its chapters directly instead of resolving it via
+    # get_any_book and re-selecting. One book with a handful of chapters:
+    # a single LEFT OUTER JOIN beats a second selectin round-trip.
+    # BookOut nests nothing below chapters, so any other relationship
+    # access is a bug — raise instead of silently lazy-loading.
     result = await db.execute(
-        select(Book).options(selectinload(Book.chapters)).where(Book.id == book.id)
+        select(Book)
+        .options(joinedload(Book.chapters), raiseload("*"))
+        .limit(1)
     )
-    return result.scalar_one()
+    book = result.unique().scalar_one_or_none()
+    if not book:
+        raise HTTPException(status_code=404, detail="Kitob topilmadi")
+    return book
+
+
+@router.get("/stream")
+async def admin_stream_book(
+    book: Book = Depends(get_any_book),
+    admin: AdminUser = Depends(get_current_admin),
+):
+    """Same payload as GET /book, streamed chapter by chapter.
+
+    Chapters are read through a server-side cursor and encoded one at a
+    time, so peak memory doesn't grow with the book.
+    """
+    head = BookOut.model_validate(
+        {**{f: getattr(book, f) for f in BookOut.model_fields if f != "chapters"}, "chapters": []}
+    ).model_dump_json(exclude={"chapters"})
+    book_id = book.id
+
+    async def _gen():
+        yield head[:-1] + ',"chapters":['
+        # Own session: get_db's session is closed before the body streams
+        async with AsyncSessionLocal() as db:
+            chapters = await db.stream_scalars(
+                select(Chapter)
+                .where(Chapter.book_id == book_id)
+                .order_by(Chapter.sort_order)
+                .execution_options(yield_per=100)
+            )
+            sep = ""
+            async for ch in chapters:
+                yield sep + ChapterOut.model_validate(ch).model_dump_json()
+                sep = ","
+        yield "]}"
+
+    return StreamingResponse(_gen(), media_type="application/json")
 
 
 @router.put("/publish")
 async def publish_book(
+    background: BackgroundTasks,
     book: Book = Depends(get_any_book),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
@@ -48,29 +146,33 @@ async def publish_book(
     """Publish current state: increment manifest version."""
     from app.models.system import ManifestVersion
 
-    book.manifest_version += 1
-    book.is_published = True
+    # Increment in SQL: no read-modify-write race between admins/workers
+    result = await db.execute(
+        update(Book)
+        .where(Book.id == book.id)
+        .values(
+            manifest_version=Book.manifest_version + 1,
+            is_published=True,
+            **manifest_counter_values(book.id),
+        )
+        .returning(Book.manifest_version)
+    )
+    version = result.scalar_one()
 
     # Record manifest version
-    mv = ManifestVersion(
-        version=book.manifest_version,
+    db.add(ManifestVersion(
+        version=version,
         published_by=admin.id,
-        changelog=f"Published v{book.manifest_version}",
-    )
-    db.add(mv)
+        changelog=f"Published v{version}",
+    ))
+    await db.flush()
 
-    # Audit log
-    log = AuditLog(
-        admin_id=admin.id,
-        action="publish",
-        entity_type="book",
-        entity_id=book.id,
-        details={"version": book.manifest_version},
+    background.add_task(
+        write_audit_log, admin.id, "publish",
+        entity_type="book", entity_id=book.id, details={"version": version},
     )
-    db.add(log)
-    await db.flush()
 
-    return {"version": book.manifest_version, "message": "Kitob nashr qilindi"}
+    return {"version": version, "message": "Kitob nashr qilindi"}
 
 
 # === Chapters ===
@@ -78,31 +180,35 @@ async def publish_book(
 @router.post("/chapters", response_model=ChapterOut, status_code=201)
 async def create_chapter(
     data: ChapterCreate,
+    background: BackgroundTasks,
     book: Book = Depends(get_any_book),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
+    # INSERT ... RETURNING hydrates the row (incl. server defaults) in one round-trip
+    result = await db.execute(
+        insert(Chapter).values(book_id=book.id, **data.model_dump()).returning(Chapter)
+    )
+    chapter = result.scalar_one()
 
-    chapter = Chapter(book_id=book.id, **data.model_dump())
-    db.add(chapter)
-    await db.flush()
-
-    db.add(AuditLog(admin_id=admin.id, action="create", entity_type="chapter", entity_id=chapter.id))
+    background.add_task(write_audit_log, admin.id, "create", entity_type="chapter", entity_id=chapter.id)
     return chapter
 
 
 @router.delete("/chapters/{chapter_id}")
 async def delete_chapter(
     chapter_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Chapter).where(Chapter.id == chapter_id))
-    chapter = result.scalar_one_or_none()
-    if not chapter:
+    # One round-trip; pages.chapter_id is ON DELETE SET NULL in the schema
+    result = await db.execute(
+        delete(Chapter).where(Chapter.id == chapter_id).returning(Chapter.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Bob topilmadi")
-    await db.delete(chapter)
-    db.add(AuditLog(admin_id=admin.id, action="delete", entity_type="chapter", entity_id=chapter_id))
+    background.add_task(write_audit_log, admin.id, "delete", entity_type="chapter", entity_id=chapter_id)
     return {"message": "Bob o'chirildi"}
 
 
@@ -114,37 +220,48 @@ async def admin_get_pages(
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get all pages with analysis status and unit counts."""
+    """Get all pages with analysis status and unit counts.
 
-    result = await db.execute(
-        select(Page).where(Page.book_id == book.id).order_by(Page.page_number)
-    )
-    pages = result.scalars().all()
+    Cached in Redis as the serialized response; every write path that
+    changes a listed field deletes the key in a BackgroundTask, i.e. after
+    get_db has committed, so a concurrent read can't re-cache old rows.
+    """
+    cache_key = pages_key(book.id)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-    # Get unit counts per page
-    counts_result = await db.execute(
-        select(TextUnit.page_id, func.count(TextUnit.id))
-        .group_by(TextUnit.page_id)
+    # Unit counts are aggregated in the same query (LEFT JOIN keeps empty pages)
+    result = await db.execute(
+        select(Page, func.count(TextUnit.id).label("unit_count"))
+        .outerjoin(TextUnit, TextUnit.page_id == Page.id)
+        .where(Page.book_id == book.id)
+        .group_by(Page.id)
+        .order_by(Page.page_number)
     )
-    unit_counts = dict(counts_result.all())
 
-    return [
+    base = settings.MEDIA_BASE_URL
+    pages = [
         {
             "id": p.id,
             "page_number": p.page_number,
             "layout_type": p.layout_type,
-            "image_url": f"{settings.MEDIA_BASE_URL}/{p.image_path}" if p.image_path else None,
-            "source_image_url": f"{settings.MEDIA_BASE_URL}/{p.source_image_path}" if p.source_image_path else None,
+            "image_url": f"{base}/{p.image_path}" if p.image_path else None,
+            "source_image_url": f"{base}/{p.source_image_path}" if p.source_image_path else None,
             "has_text_data": p.has_text_data,
             "is_annotated": p.is_annotated,
             "analysis_status": p.analysis_status.value if p.analysis_status else "empty",
             "analysis_error": p.analysis_error,
-            "unit_count": unit_counts.get(p.id, 0),
+            "unit_count": unit_count,
             "qa_report": p.qa_report,
         }
-        for p in pages
+        for p, unit_count in result.all()
     ]
 
+    body = dump_json(pages)
+    await cache_set(cache_key, body)
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/pages/{page_id}/units", response_model=List[TextUnitOut])
 async def admin_get_page_units(
@@ -155,14 +272,65 @@ async def admin_get_page_units(
     result = await db.execute(
         select(TextUnit).where(TextUnit.page_id == page_id).order_by(TextUnit.sort_order)
     )
-    units = result.scalars().all()
-    return units
+    units = TEXT_UNIT_LIST_ADAPTER.validate_python(result.scalars().all(), from_attributes=True)
+    return Response(content=TEXT_UNIT_LIST_ADAPTER.dump_json(units), media_type="application/json")
 
 
 # === Image Upload & Analysis ===
 
+async def _analyze_page_inline(page_id: int, relative_path: str) -> None:
+    """OCR an uploaded page image in its own session (runs as a BackgroundTask).
+
+    Used when the Celery broker is unreachable.
+    """
+    file_path = os.path.join(settings.MEDIA_DIR, relative_path)
+    async with AsyncSessionLocal() as db:
+        page = await db.get(Page, page_id)
+        if not page:
+            return
+        try:
+            from app.services.image_analyzer import analyze_image
+            # Tesseract blocks for about a second per image; keep it off the loop
+            units = await asyncio.to_thread(analyze_image, file_path)
+
+            # Delete existing non-manual units
+            await db.execute(
+                delete(TextUnit).where(
+                    TextUnit.page_id == page.id,
+                    TextUnit.is_manual == False
+                )
+            )
+
+            if units:
+                await db.execute(insert(TextUnit), [
+                    {
+                        "page_id": page.id,
+                        "unit_type": UNIT_TYPE_MAP.get(unit_data.unit_type, UnitType.WORD),
+                        "text_content": unit_data.text,
+                        "bbox_x": unit_data.bbox_x,
+                        "bbox_y": unit_data.bbox_y,
+                        "bbox_w": unit_data.bbox_w,
+                        "bbox_h": unit_data.bbox_h,
+                        "sort_order": unit_data.sort_order,
+                        "confidence": unit_data.confidence,
+                        "is_manual": False,
+                        "metadata_": unit_data.metadata or {},
+                    }
+                    for unit_data in units
+                ])
+
+            page.analysis_status = PageStatus.DRAFT
+            page.has_text_data = len(units) > 0
+        except Exception as analysis_error:
+            page.analysis_status = PageStatus.ERROR
+            page.analysis_error = str(analysis_error)
+        await db.commit()
+        await cache_delete(pages_key(page.book_id))
+
+
 @router.post("/pages/upload-image")
 async def upload_page_image(
+    background: BackgroundTasks,
     page_number: int = Form(...),
     file: UploadFile = File(...),
     book: Book = Depends(get_any_book),
@@ -178,9 +346,15 @@ async def upload_page_image(
         raise HTTPException(status_code=400, detail="Fayl nomi yo'q")
 
     ext = file.filename.lower().rsplit(".", 1)[-1] if "." in file.filename else ""
-    if ext not in ("png", "jpg", "jpeg", "webp"):
+    if ext not in IMAGE_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Faqat PNG, JPG, WEBP formatlar qabul qilinadi")
 
+    # Check the content too, before anything is written or handed to PIL
+    head = await file.read(12)
+    await file.seek(0)
+    if sniff_image_type(head) != ("jpeg" if ext == "jpg" else ext):
+        raise HTTPException(status_code=400, detail="Fayl tarkibi uning kengaytmasiga mos emas")
+
     # book is injected via get_any_book dependency
 
     # Save uploaded image
@@ -190,15 +364,11 @@ async def upload_page_image(
     file_path = os.path.join(upload_dir, filename)
     relative_path = f"pages/source/{filename}"
 
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    await _save_upload(file, file_path)
 
     # Get image dimensions
     try:
-        from PIL import Image
-        img = Image.open(file_path)
-        img_width, img_height = img.size
-        img.close()
+        img_width, img_height = await asyncio.to_thread(_image_size, file_path)
     except Exception:
         img_width, img_height = None, None
 
@@ -230,59 +400,26 @@ async def upload_page_image(
         # Update book total_pages
         book.total_pages = max(book.total_pages, page_number)
 
-    await db.flush()
+    # The worker loads the page row: commit before the task can be picked up
+    await db.commit()
 
-    # Start background analysis
+    # Enqueue here, so the returned task_id is one the broker accepted.
+    # Without Celery the analysis runs inline after the response (no task_id).
+    task_id = None
     try:
         from app.tasks.page_tasks import analyze_page_image_task
-        task = analyze_page_image_task.delay(page.id, relative_path)
-        task_id = task.id
+        task_id = analyze_page_image_task.delay(page.id, relative_path).id
     except Exception as e:
-        # If Celery is not available, run analysis inline
-        task_id = None
-        try:
-            from app.services.image_analyzer import analyze_image
-            units = analyze_image(file_path)
+        logger.warning(f"Celery unavailable, analyzing page {page.id} inline: {e}")
+        background.add_task(_analyze_page_inline, page.id, relative_path)
 
-            # Delete existing non-manual units
-            await db.execute(
-                delete(TextUnit).where(
-                    TextUnit.page_id == page.id,
-                    TextUnit.is_manual == False
-                )
-            )
+    background.add_task(cache_delete, pages_key(book.id))
 
-            for unit_data in units:
-                unit_type_map = UNIT_TYPE_MAP
-                unit = TextUnit(
-                    page_id=page.id,
-                    unit_type=unit_type_map.get(unit_data.unit_type, UnitType.WORD),
-                    text_content=unit_data.text,
-                    bbox_x=unit_data.bbox_x,
-                    bbox_y=unit_data.bbox_y,
-                    bbox_w=unit_data.bbox_w,
-                    bbox_h=unit_data.bbox_h,
-                    sort_order=unit_data.sort_order,
-                    confidence=unit_data.confidence,
-                    is_manual=False,
-                    metadata_=unit_data.metadata or {},
-                )
-                db.add(unit)
-
-            page.analysis_status = PageStatus.DRAFT
-            page.has_text_data = len(units) > 0
-            await db.flush()
-        except Exception as analysis_error:
-            page.analysis_status = PageStatus.ERROR
-            page.analysis_error = str(analysis_error)
-
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="upload_image",
-        entity_type="page",
-        entity_id=page.id,
+    background.add_task(
+        write_audit_log, admin.id, "upload_image",
+        entity_type="page", entity_id=page.id,
         details={"filename": file.filename, "page_number": page_number, "task_id": task_id},
-    ))
+    )
 
     return {
         "message": "Rasm yuklandi va tahlil boshlandi",
@@ -301,15 +438,18 @@ async def get_page_draft(
 ):
     """Get page draft with all units for overlay editor."""
     result = await db.execute(
-        select(Page).options(selectinload(Page.text_units)).where(Page.id == page_id)
+        select(Page).options(selectinload(Page.text_units), raiseload("*")).where(Page.id == page_id)
     )
     page = result.scalar_one_or_none()
     if not page:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    units = sorted(page.text_units, key=lambda u: u.sort_order)
+    # Page.text_units is ordered by sort_order in the relationship itself
+    units = page.text_units
 
-    return {
+    # Already JSON-native: serialize directly instead of letting FastAPI
+    # walk hundreds of unit dicts through jsonable_encoder
+    return Response(content=dump_json({
         "id": page.id,
         "page_number": page.page_number,
         "analysis_status": page.analysis_status.value if page.analysis_status else "empty",
@@ -322,7 +462,7 @@ async def get_page_draft(
         "units": [
             {
                 "id": u.id,
-                "unit_type": u.unit_type.value if hasattr(u.unit_type, 'value') else u.unit_type,
+                "unit_type": UNIT_TYPE_MAP_INV.get(u.unit_type, u.unit_type),
                 "text_content": u.text_content,
                 "bbox_x": u.bbox_x,
                 "bbox_y": u.bbox_y,
@@ -335,12 +475,13 @@ async def get_page_draft(
             }
             for u in units
         ],
-    }
+    }), media_type="application/json")
 
 
 @router.put("/pages/{page_id}/units/bulk")
 async def bulk_update_units(
     page_id: int,
+    background: BackgroundTasks,
     units: List[dict] = Body(...),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
@@ -357,9 +498,10 @@ async def bulk_update_units(
     if not page:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    created = 0
-    updated = 0
-    deleted = 0
+    # Partition actions first so each kind hits the DB once
+    delete_ids = []
+    updates: dict[int, dict] = {}
+    new_rows = []  # inserted together below
 
     for u in units:
         action = u.get("action", "update")
@@ -367,61 +509,65 @@ async def bulk_update_units(
         if action == "delete":
             unit_id = u.get("id")
             if unit_id:
-                await db.execute(delete(TextUnit).where(TextUnit.id == unit_id, TextUnit.page_id == page_id))
-                deleted += 1
+                delete_ids.append(unit_id)
 
         elif action == "create":
-            unit_type_map = UNIT_TYPE_MAP
-            new_unit = TextUnit(
+            new_rows.append(_unit_row(
+                u,
                 page_id=page_id,
-                unit_type=unit_type_map.get(u.get("unit_type", "word"), UnitType.WORD),
-                text_content=u.get("text_content", ""),
-                bbox_x=u.get("bbox_x", 0),
-                bbox_y=u.get("bbox_y", 0),
-                bbox_w=u.get("bbox_w", 0),
-                bbox_h=u.get("bbox_h", 0),
-                sort_order=u.get("sort_order", 0),
+                unit_type=UNIT_TYPE_MAP.get(u.get("unit_type", "word"), UnitType.WORD),
                 is_manual=True,
                 metadata_=u.get("metadata", {}),
-            )
-            db.add(new_unit)
-            created += 1
+            ))
 
         elif action == "update":
             unit_id = u.get("id")
-            if not unit_id:
-                continue
-            result = await db.execute(
-                select(TextUnit).where(TextUnit.id == unit_id, TextUnit.page_id == page_id)
-            )
-            unit = result.scalar_one_or_none()
-            if not unit:
-                continue
+            if unit_id:
+                # Repeated ids: later payload fields win, as before
+                updates.setdefault(unit_id, {}).update(u)
 
+    created = len(new_rows)
+    deleted = len(delete_ids)
+    updated = 0
+
+    if delete_ids:
+        await db.execute(
+            delete(TextUnit).where(TextUnit.page_id == page_id, TextUnit.id.in_(delete_ids))
+        )
+
+    if updates:
+        result = await db.execute(
+            select(TextUnit).where(TextUnit.page_id == page_id, TextUnit.id.in_(list(updates)))
+        )
+        for unit in result.scalars():
+            u = updates[unit.id]
             for field in ["text_content", "bbox_x", "bbox_y", "bbox_w", "bbox_h", "sort_order"]:
                 if field in u:
                     setattr(unit, field, u[field])
             if "unit_type" in u:
-                try:
-                    unit.unit_type = UnitType(u["unit_type"])
-                except ValueError:
-                    pass
+                unit_type = UNIT_TYPE_MAP.get(u["unit_type"])
+                if unit_type is not None:
+                    unit.unit_type = unit_type
             if "metadata" in u:
                 unit.metadata_ = u["metadata"]
             unit.is_manual = True
             updated += 1
 
+    if new_rows:
+        # Single multi-row INSERT (executemany / insertmanyvalues)
+        await db.execute(insert(TextUnit), new_rows)
+
     page.is_annotated = True
     page.has_text_data = True
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="bulk_edit",
-        entity_type="page",
-        entity_id=page_id,
+    background.add_task(cache_delete, pages_key(page.book_id))
+
+    background.add_task(
+        write_audit_log, admin.id, "bulk_edit",
+        entity_type="page", entity_id=page_id,
         details={"created": created, "updated": updated, "deleted": deleted},
-    ))
+    )
 
     return {
         "message": f"Yangilandi: {created} yaratildi, {updated} o'zgartirildi, {deleted} o'chirildi",
@@ -434,6 +580,7 @@ async def bulk_update_units(
 @router.post("/pages/{page_id}/publish")
 async def publish_page(
     page_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -441,28 +588,33 @@ async def publish_page(
     from app.services.qa_checker import run_qa_checks
 
     result = await db.execute(
-        select(Page).options(selectinload(Page.text_units)).where(Page.id == page_id)
+        select(Page).options(selectinload(Page.text_units), raiseload("*")).where(Page.id == page_id)
     )
     page = result.scalar_one_or_none()
     if not page:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    # Build unit dicts for QA
-    units_data = [
+    # One pass over the units: the version snapshot doubles as QA input
+    # (run_qa_checks reads keys with .get; no audio mapping check yet)
+    snapshot = [
         {
+            "unit_type": UNIT_TYPE_MAP_INV.get(u.unit_type, str(u.unit_type)),
             "text_content": u.text_content,
             "bbox_x": u.bbox_x,
             "bbox_y": u.bbox_y,
             "bbox_w": u.bbox_w,
             "bbox_h": u.bbox_h,
             "sort_order": u.sort_order,
-            "audio_segment_url": None,  # TODO: add audio mapping check
+            "is_manual": u.is_manual,
+            "confidence": u.confidence,
+            "metadata": u.metadata_,
         }
         for u in page.text_units
     ]
 
-    qa_result = run_qa_checks(units_data)
-    page.qa_report = qa_result.to_dict()
+    qa_result = run_qa_checks(snapshot)
+    qa_report = qa_result.to_dict()
+    page.qa_report = qa_report
 
     if not qa_result.passed:
         await db.flush()
@@ -470,44 +622,25 @@ async def publish_page(
             status_code=422,
             detail={
                 "message": "QA tekshiruvdan o'tmadi",
-                "qa_report": qa_result.to_dict(),
+                "qa_report": qa_report,
             }
         )
 
     # QA passed — create version snapshot BEFORE publishing
     from app.models.book import PageVersion
 
-    # Get next version number
-    ver_result = await db.execute(
-        select(func.coalesce(func.max(PageVersion.version), 0))
-        .where(PageVersion.page_id == page_id)
+    # Next version number is computed inside the INSERT itself
+    next_version = await db.scalar(
+        insert(PageVersion).values(
+            page_id=page_id,
+            version=select(func.coalesce(func.max(PageVersion.version), 0) + 1)
+            .where(PageVersion.page_id == page_id)
+            .scalar_subquery(),
+            snapshot=snapshot,
+            qa_report=qa_report,
+            published_by=admin.id,
+        ).returning(PageVersion.version)
     )
-    next_version = ver_result.scalar() + 1
-
-    # Serialize text units to snapshot
-    snapshot = [
-        {
-            "unit_type": u.unit_type.value if hasattr(u.unit_type, 'value') else str(u.unit_type),
-            "text_content": u.text_content,
-            "bbox_x": u.bbox_x,
-            "bbox_y": u.bbox_y,
-            "bbox_w": u.bbox_w,
-            "bbox_h": u.bbox_h,
-            "sort_order": u.sort_order,
-            "is_manual": u.is_manual,
-            "confidence": u.confidence,
-            "metadata": u.metadata_,
-        }
-        for u in page.text_units
-    ]
-
-    db.add(PageVersion(
-        page_id=page_id,
-        version=next_version,
-        snapshot=snapshot,
-        qa_report=qa_result.to_dict(),
-        published_by=admin.id,
-    ))
 
     # Publish
     page.analysis_status = PageStatus.PUBLISHED
@@ -516,19 +649,19 @@ async def publish_page(
 
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="publish_page",
-        entity_type="page",
-        entity_id=page_id,
+    background.add_task(cache_delete, pages_key(page.book_id), versions_key(page_id))
+
+    background.add_task(
+        write_audit_log, admin.id, "publish_page",
+        entity_type="page", entity_id=page_id,
         details={"qa_score": qa_result.score, "version": next_version},
-    ))
+    )
 
     return {
         "message": f"Sahifa nashr qilindi (v{next_version})",
         "page_id": page_id,
         "version": next_version,
-        "qa_report": qa_result.to_dict(),
+        "qa_report": qa_report,
     }
 
 
@@ -539,78 +672,79 @@ async def list_page_versions(
     db: AsyncSession = Depends(get_db),
 ):
     """List all published versions of a page."""
+    cache_key = versions_key(page_id)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Count units and pick the score in SQL: the snapshots themselves can be
+    # large and are only needed for rollback
     result = await db.execute(
-        select(PageVersion)
+        select(
+            PageVersion.id,
+            PageVersion.version,
+            func.coalesce(func.json_array_length(PageVersion.snapshot), 0).label("unit_count"),
+            PageVersion.qa_report["score"].as_float().label("qa_score"),
+            PageVersion.created_at,
+        )
         .where(PageVersion.page_id == page_id)
         .order_by(PageVersion.version.desc())
     )
-    versions = result.scalars().all()
 
-    return [
+    body = dump_json([
         {
             "id": v.id,
             "version": v.version,
-            "unit_count": len(v.snapshot) if v.snapshot else 0,
-            "qa_score": v.qa_report.get("score") if v.qa_report else None,
+            "unit_count": v.unit_count,
+            "qa_score": v.qa_score,
             "created_at": v.created_at.isoformat() if v.created_at else None,
         }
-        for v in versions
-    ]
+        for v in result.all()
+    ])
+    await cache_set(cache_key, body)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/pages/{page_id}/rollback/{version_id}")
 async def rollback_page(
     page_id: int,
     version_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Rollback a page to a previous version's text units."""
-    # Load version
-    ver_result = await db.execute(
-        select(PageVersion).where(
-            PageVersion.id == version_id,
-            PageVersion.page_id == page_id,
-        )
-    )
-    version = ver_result.scalar_one_or_none()
-    if not version:
+    # Load page and version together. The current units are not loaded:
+    # they are replaced wholesale below.
+    row = (await db.execute(
+        select(Page, PageVersion)
+        .join(PageVersion, PageVersion.page_id == Page.id)
+        .options(raiseload("*"))
+        .where(Page.id == page_id, PageVersion.id == version_id)
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Versiya topilmadi")
-
-    # Load page
-    page_result = await db.execute(
-        select(Page).options(selectinload(Page.text_units)).where(Page.id == page_id)
-    )
-    page = page_result.scalar_one_or_none()
-    if not page:
-        raise HTTPException(status_code=404, detail="Sahifa topilmadi")
+    page, version = row
 
     # Delete current text units
     await db.execute(
         delete(TextUnit).where(TextUnit.page_id == page_id)
     )
 
-    # Restore from snapshot
-    for u_data in version.snapshot:
-        unit_type_val = u_data.get("unit_type", "letter")
-        try:
-            unit_type = UnitType(unit_type_val)
-        except ValueError:
-            unit_type = UnitType.LETTER
-
-        db.add(TextUnit(
+    # Restore from snapshot (one multi-row INSERT)
+    rows = [
+        _unit_row(
+            u_data,
             page_id=page_id,
-            unit_type=unit_type,
-            text_content=u_data.get("text_content", ""),
-            bbox_x=u_data.get("bbox_x", 0),
-            bbox_y=u_data.get("bbox_y", 0),
-            bbox_w=u_data.get("bbox_w", 0),
-            bbox_h=u_data.get("bbox_h", 0),
-            sort_order=u_data.get("sort_order", 0),
+            unit_type=UNIT_TYPE_MAP.get(u_data.get("unit_type", "letter"), UnitType.LETTER),
             is_manual=u_data.get("is_manual", False),
             confidence=u_data.get("confidence"),
             metadata_=u_data.get("metadata"),
-        ))
+        )
+        for u_data in version.snapshot
+    ]
+    if rows:
+        await db.execute(insert(TextUnit), rows)
 
     # Set page to DRAFT for re-review
     page.analysis_status = PageStatus.DRAFT
@@ -618,13 +752,12 @@ async def rollback_page(
 
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="rollback_page",
-        entity_type="page",
-        entity_id=page_id,
-        details={"restored_version": version.version},
-    ))
+    background.add_task(cache_delete, pages_key(page.book_id))
+
+    background.add_task(
+        write_audit_log, admin.id, "rollback_page",
+        entity_type="page", entity_id=page_id, details={"restored_version": version.version},
+    )
 
     return {
         "message": f"Sahifa v{version.version} ga qaytarildi",
@@ -640,6 +773,7 @@ async def rollback_page(
 async def create_text_unit(
     page_id: int,
     data: TextUnitCreate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -649,24 +783,28 @@ async def create_text_unit(
     if not page:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    unit = TextUnit(
-        page_id=page_id,
-        unit_type=UnitType(data.unit_type),
-        text_content=data.text_content,
-        bbox_x=data.bbox_x,
-        bbox_y=data.bbox_y,
-        bbox_w=data.bbox_w,
-        bbox_h=data.bbox_h,
-        sort_order=data.sort_order,
-        is_manual=True,
+    # INSERT ... RETURNING hands back the populated row in one round trip
+    result = await db.execute(
+        insert(TextUnit).values(
+            page_id=page_id,
+            unit_type=UnitType(data.unit_type),
+            text_content=data.text_content,
+            bbox_x=data.bbox_x,
+            bbox_y=data.bbox_y,
+            bbox_w=data.bbox_w,
+            bbox_h=data.bbox_h,
+            sort_order=data.sort_order,
+            is_manual=True,
+        ).returning(TextUnit)
     )
-    db.add(unit)
+    unit = result.scalar_one()
 
     page.is_annotated = True
     page.has_text_data = True
     await db.flush()
 
-    db.add(AuditLog(admin_id=admin.id, action="create", entity_type="text_unit", entity_id=unit.id))
+    background.add_task(cache_delete, pages_key(page.book_id))
+    background.add_task(write_audit_log, admin.id, "create", entity_type="text_unit", entity_id=unit.id)
     return unit
 
 
@@ -674,6 +812,7 @@ async def create_text_unit(
 async def update_text_unit(
     unit_id: int,
     data: TextUnitUpdate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -688,13 +827,14 @@ async def update_text_unit(
         setattr(unit, field, value)
 
     await db.flush()
-    db.add(AuditLog(admin_id=admin.id, action="update", entity_type="text_unit", entity_id=unit_id))
+    background.add_task(write_audit_log, admin.id, "update", entity_type="text_unit", entity_id=unit_id)
     return unit
 
 
 @router.delete("/units/{unit_id}")
 async def delete_text_unit(
     unit_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -703,7 +843,8 @@ async def delete_text_unit(
     if not unit:
         raise HTTPException(status_code=404, detail="Birlik topilmadi")
     await db.delete(unit)
-    db.add(AuditLog(admin_id=admin.id, action="delete", entity_type="text_unit", entity_id=unit_id))
+    await _invalidate_pages_of(db, background, unit.page_id)
+    background.add_task(write_audit_log, admin.id, "delete", entity_type="text_unit", entity_id=unit_id)
     return {"message": "Birlik o'chirildi"}
 
 
@@ -711,6 +852,7 @@ async def delete_text_unit(
 
 @router.post("/import-pdf")
 async def import_pdf(
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
@@ -724,21 +866,26 @@ async def import_pdf(
     os.makedirs(upload_dir, exist_ok=True)
     file_path = os.path.join(upload_dir, "book.pdf")
 
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    await _save_upload(file, file_path)
 
-    # Trigger async processing
+    # Enqueue before responding: if the broker is down the client gets a
+    # 503, not a task_id that never maps to a task
     from app.tasks.pdf_tasks import process_pdf_task
-    task = process_pdf_task.delay(file_path)
+    try:
+        task_id = process_pdf_task.delay(file_path).id
+    except Exception as e:
+        logger.error(f"PDF import enqueue failed: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Vazifalar navbati hozircha ishlamayapti, keyinroq urinib ko'ring",
+        )
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="import_pdf",
-        entity_type="book",
-        details={"filename": file.filename, "task_id": task.id},
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "import_pdf",
+        entity_type="book", details={"filename": file.filename, "task_id": task_id},
+    )
 
-    return {"message": "PDF import boshlandi", "task_id": task.id}
+    return {"message": "PDF import boshlandi", "task_id": task_id}
 
 
 
@@ -749,6 +896,7 @@ async def import_pdf(
 @router.post("/units/{unit_id}/split")
 async def split_unit(
     unit_id: int,
+    background: BackgroundTasks,
     separator: Optional[str] = Body(None, embed=True),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
@@ -801,50 +949,67 @@ async def split_unit(
     if len(parts) <= 1:
         raise HTTPException(status_code=400, detail="Bo'lishga hojat yo'q — bitta qism")
 
-    # Shift sort_order of subsequent units to make room
-    await db.execute(
-        update(TextUnit)
+    # Place parts in the gap before the next unit when it is wide enough
+    # (analyzed pages use sparse sort_orders); otherwise shift the
+    # subsequent units to make room
+    next_order = await db.scalar(
+        select(func.min(TextUnit.sort_order))
         .where(TextUnit.page_id == unit.page_id, TextUnit.sort_order > unit.sort_order)
-        .values(sort_order=TextUnit.sort_order + len(parts) - 1)
     )
+    step = 1
+    if next_order is not None:
+        gap_step = (next_order - unit.sort_order) // len(parts)
+        if gap_step >= 1:
+            step = gap_step
+        else:
+            await db.execute(
+                update(TextUnit)
+                .where(TextUnit.page_id == unit.page_id, TextUnit.sort_order > unit.sort_order)
+                .values(sort_order=TextUnit.sort_order + len(parts) - 1)
+            )
 
     # Get existing metadata
     existing_meta = dict(unit.metadata_ or {})
     section = existing_meta.get("section", "")
 
-    # Create individual units
-    new_units = []
-    for i, part in enumerate(parts):
-        meta = {"section": section, "grid": {"row": unit.sort_order, "col": i}}
-        new_unit = TextUnit(
-            page_id=unit.page_id,
-            unit_type=unit.unit_type,
-            text_content=part,
-            bbox_x=0, bbox_y=0, bbox_w=0, bbox_h=0,
-            sort_order=unit.sort_order + i,
-            is_manual=True,
-            metadata_=meta,
-        )
-        db.add(new_unit)
-        new_units.append(new_unit)
+    # Create individual units in one INSERT; RETURNING gives the ids for the
+    # response, in the same order as parts
+    result = await db.execute(
+        insert(TextUnit).returning(
+            TextUnit.id, TextUnit.text_content, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "page_id": unit.page_id,
+                "unit_type": unit.unit_type,
+                "text_content": part,
+                "bbox_x": 0, "bbox_y": 0, "bbox_w": 0, "bbox_h": 0,
+                "sort_order": unit.sort_order + i * step,
+                "is_manual": True,
+                "metadata_": {"section": section, "grid": {"row": unit.sort_order, "col": i}},
+            }
+            for i, part in enumerate(parts)
+        ],
+    )
+    new_units = result.all()
 
     # Delete the original unit
     await db.execute(delete(TextUnit).where(TextUnit.id == unit_id))
 
     await db.flush()
 
+    await _invalidate_pages_of(db, background, unit.page_id)
+
     # Audit log
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="split_unit",
-        entity_type="text_unit",
-        entity_id=unit_id,
+    background.add_task(
+        write_audit_log, admin.id, "split_unit",
+        entity_type="text_unit", entity_id=unit_id,
         details={"parts": len(parts), "page_id": unit.page_id},
-    ))
+    )
 
     return {
         "message": f"Unit {len(parts)} qismga bo'lindi",
-        "parts": [{"id": u.id, "text": u.text_content} for u in new_units],
+        "parts": [{"id": row.id, "text": row.text_content} for row in new_units],
     }
 
 
@@ -856,30 +1021,36 @@ from app.models.section import Section, SectionType as SectionTypeEnum
 from app.schemas import SectionOut, SectionUpdate, SectionMerge
 from app.services.sectioning import auto_section_page
 
+SECTION_TYPE_MAP = {t.value: t for t in SectionTypeEnum}
+
 
 @router.post("/pages/{page_id}/auto-section")
 async def auto_section(
     page_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Run auto-sectioning algorithm on a page's text units."""
-    # Load page with units
-    result = await db.execute(
-        select(Page).options(selectinload(Page.text_units)).where(Page.id == page_id)
-    )
-    page = result.scalar_one_or_none()
-    if not page:
+    if await db.scalar(select(Page.id).where(Page.id == page_id)) is None:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    if not page.text_units:
-        raise HTTPException(status_code=400, detail="Bu sahifada matnlar yo'q")
-
-    # Build unit dicts for algorithm
+    # Fetch only the columns the algorithm reads, as plain rows (no ORM
+    # objects). Ordered by (bbox_y, sort_order) so the stable Y-sort in
+    # _segment_by_y_axis gets presorted input and runs in linear time.
+    result = await db.execute(
+        select(
+            TextUnit.id, TextUnit.unit_type, TextUnit.text_content,
+            TextUnit.bbox_x, TextUnit.bbox_y, TextUnit.bbox_w, TextUnit.bbox_h,
+            TextUnit.sort_order, TextUnit.metadata_,
+        )
+        .where(TextUnit.page_id == page_id)
+        .order_by(TextUnit.bbox_y, TextUnit.sort_order)
+    )
     units_data = [
         {
             "id": u.id,
-            "unit_type": u.unit_type.value if hasattr(u.unit_type, 'value') else u.unit_type,
+            "unit_type": UNIT_TYPE_MAP_INV.get(u.unit_type, u.unit_type),
             "text_content": u.text_content,
             "bbox_x": u.bbox_x,
             "bbox_y": u.bbox_y,
@@ -888,13 +1059,15 @@ async def auto_section(
             "sort_order": u.sort_order,
             "metadata": u.metadata_ or {},
         }
-        for u in page.text_units
+        for u in result.all()
     ]
+    if not units_data:
+        raise HTTPException(status_code=400, detail="Bu sahifada matnlar yo'q")
 
     # Run algorithm
     try:
         section_dicts = auto_section_page(page_id, units_data)
-    except AssertionError as e:
+    except ValueError as e:
         raise HTTPException(status_code=500, detail=f"Sectioning xatosi: {str(e)}")
 
     # Delete existing auto-generated sections (keep manual ones)
@@ -908,10 +1081,7 @@ async def auto_section(
     # Create new sections
     created_sections = []
     for s in section_dicts:
-        try:
-            section_type = SectionTypeEnum(s['section_type'])
-        except ValueError:
-            section_type = SectionTypeEnum.GENERIC
+        section_type = SECTION_TYPE_MAP.get(s['section_type'], SectionTypeEnum.GENERIC)
 
         section = Section(
             page_id=page_id,
@@ -930,13 +1100,10 @@ async def auto_section(
 
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="auto_section",
-        entity_type="page",
-        entity_id=page_id,
-        details={"sections_created": len(created_sections)},
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "auto_section",
+        entity_type="page", entity_id=page_id, details={"sections_created": len(created_sections)},
+    )
 
     return {
         "message": f"{len(created_sections)} bo'lim yaratildi",
@@ -992,6 +1159,7 @@ async def get_page_sections(
 async def update_section(
     section_id: int,
     data: SectionUpdate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -1012,12 +1180,10 @@ async def update_section(
     section.is_manual = True
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="update_section",
-        entity_type="section",
-        entity_id=section_id,
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "update_section",
+        entity_type="section", entity_id=section_id,
+    )
 
     return {"message": "Bo'lim yangilandi", "id": section.id}
 
@@ -1025,6 +1191,7 @@ async def update_section(
 @router.delete("/sections/{section_id}")
 async def delete_section(
     section_id: int,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -1037,12 +1204,10 @@ async def delete_section(
     await db.delete(section)
     await db.flush()
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="delete_section",
-        entity_type="section",
-        entity_id=section_id,
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "delete_section",
+        entity_type="section", entity_id=section_id,
+    )
 
     return {"message": "Bo'lim o'chirildi"}
 
@@ -1050,6 +1215,7 @@ async def delete_section(
 @router.post("/sections/merge")
 async def merge_sections(
     data: SectionMerge,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
@@ -1073,28 +1239,43 @@ async def merge_sections(
     if len(page_ids) > 1:
         raise HTTPException(status_code=400, detail="Bo'limlar bitta sahifadan bo'lishi kerak")
 
-    # Merge: keep first, absorb others
-    primary = sections[0]
-    merged_unit_ids = list(primary.unit_ids or [])
-
-    for s in sections[1:]:
-        merged_unit_ids.extend(s.unit_ids or [])
-        await db.delete(s)
-
-    primary.unit_ids = merged_unit_ids
-    primary.bbox_y_start = min(s.bbox_y_start or 0 for s in sections)
-    primary.bbox_y_end = max(s.bbox_y_end or 100 for s in sections)
-    primary.is_manual = True
+    # Merge: keep first, absorb others (units and bounds in one pass)
+    primary, absorbed = sections[0], sections[1:]
+    absorbed_unit_ids = []
+    y_start = y_end = None
+    for s in sections:
+        if s is not primary:
+            absorbed_unit_ids.extend(s.unit_ids or [])
+        top, bottom = s.bbox_y_start or 0, s.bbox_y_end or 100
+        if y_start is None or top < y_start:
+            y_start = top
+        if y_end is None or bottom > y_end:
+            y_end = bottom
 
-    await db.flush()
+    await db.execute(
+        delete(Section)
+        .where(Section.id.in_([s.id for s in absorbed]))
+        .execution_options(synchronize_session=False)
+    )
+    # Appended in the database (integer[] ||), no rewrite of the primary's list
+    await db.execute(
+        update(Section)
+        .where(Section.id == primary.id)
+        .values(
+            unit_ids=Section.unit_ids.op("||")(literal(absorbed_unit_ids, ARRAY(Integer))),
+            bbox_y_start=y_start,
+            bbox_y_end=y_end,
+            is_manual=True,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    for s in sections:
+        db.expunge(s)
 
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="merge_sections",
-        entity_type="section",
-        entity_id=primary.id,
-        details={"merged_ids": data.section_ids},
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "merge_sections",
+        entity_type="section", entity_id=primary.id, details={"merged_ids": data.section_ids},
+    )
 
     return {
         "message": f"{len(data.section_ids)} bo'lim birlashtirildi",
@@ -1105,6 +1286,7 @@ async def merge_sections(
 @router.post("/sections/{section_id}/split")
 async def split_section(
     section_id: int,
+    background: BackgroundTasks,
     split_after_unit_id: int = Body(..., embed=True),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
@@ -1126,49 +1308,52 @@ async def split_section(
     first_half = unit_ids[:split_idx]
     second_half = unit_ids[split_idx:]
 
-    # Update existing section
-    section.unit_ids = first_half
-    section.is_manual = True
-
-    # Create new section for second half
-    new_section = Section(
-        page_id=section.page_id,
-        section_type=section.section_type,
-        target_letter=section.target_letter,
-        title_ar=section.title_ar,
-        title_uz=section.title_uz,
-        sort_order=section.sort_order + 1,
-        unit_ids=second_half,
-        bbox_y_start=section.bbox_y_start,
-        bbox_y_end=section.bbox_y_end,
-        is_manual=True,
+    # One statement: trim the original and shift later siblings in CTEs,
+    # insert the second half. CTEs and the INSERT share one snapshot, so the
+    # shift cannot touch the new row.
+    trimmed = (
+        update(Section)
+        .where(Section.id == section.id)
+        .values(unit_ids=first_half, is_manual=True)
+        .returning(Section.id)
+        .cte("trimmed")
     )
-    db.add(new_section)
-
-    # Shift sort_order of subsequent sections
-    await db.execute(
+    shifted = (
         update(Section)
         .where(
             Section.page_id == section.page_id,
             Section.sort_order > section.sort_order,
-            Section.id != section.id,
         )
         .values(sort_order=Section.sort_order + 1)
+        .returning(Section.id)
+        .cte("shifted")
+    )
+    new_section_id = await db.scalar(
+        insert(Section)
+        .values(
+            page_id=section.page_id,
+            section_type=section.section_type,
+            target_letter=section.target_letter,
+            title_ar=section.title_ar,
+            title_uz=section.title_uz,
+            sort_order=section.sort_order + 1,
+            unit_ids=second_half,
+            bbox_y_start=section.bbox_y_start,
+            bbox_y_end=section.bbox_y_end,
+            is_manual=True,
+        )
+        .add_cte(trimmed, shifted)
+        .returning(Section.id)
     )
 
-    await db.flush()
-
-    db.add(AuditLog(
-        admin_id=admin.id,
-        action="split_section",
-        entity_type="section",
-        entity_id=section_id,
-        details={"new_section_id": new_section.id},
-    ))
+    background.add_task(
+        write_audit_log, admin.id, "split_section",
+        entity_type="section", entity_id=section_id, details={"new_section_id": new_section_id},
+    )
 
     return {
         "message": "Bo'lim ikkiga bo'lindi",
         "original_id": section.id,
-        "new_id": new_section.id,
+        "new_id": new_section_id,
     }
 
@@ -1,9 +1,10 @@
 """Admin settings, feedback, and audit log endpoints."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, desc
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy import select, desc, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,13 +17,30 @@ from app.schemas.admin import (
     TelegramSettings,
 )
 from app.schemas.feedback import FeedbackOut
+from app.services.audit import write_audit_log
+from app.services.settings_cache import invalidate_settings
 from app.services.telegram import test_telegram_connection
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(tags=["Admin Settings"])
 
 
 # === Settings ===
 
+def _upsert_settings(rows: List[dict]):
+    """INSERT ... ON CONFLICT (key) DO UPDATE for SystemSettings rows."""
+    stmt = pg_insert(SystemSettings).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[SystemSettings.key],
+        set_={
+            "value": stmt.excluded.value,
+            "updated_by": stmt.excluded.updated_by,
+            # onupdate= isn't applied to ON CONFLICT updates
+            "updated_at": func.now(),
+        },
+    )
+
+
 @router.get("/settings", response_model=List[SystemSettingOut])
 async def get_settings_list(
     admin: AdminUser = Depends(get_current_admin),
@@ -36,48 +54,41 @@ async def get_settings_list(
 async def update_setting(
     key: str,
     data: SystemSettingUpdate,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(SystemSettings).where(SystemSettings.key == key))
-    setting = result.scalar_one_or_none()
-
-    if setting:
-        setting.value = data.value
-        setting.updated_by = admin.id
-    else:
-        setting = SystemSettings(key=key, value=data.value, updated_by=admin.id)
-        db.add(setting)
-
-    await db.flush()
-    db.add(AuditLog(
-        admin_id=admin.id, action="update_setting",
+    result = await db.scalars(
+        _upsert_settings([{"key": key, "value": data.value, "updated_by": admin.id}])
+        .returning(SystemSettings)
+        .execution_options(populate_existing=True)
+    )
+    setting = result.one()
+
+    # After the response, i.e. once get_db has committed the upsert
+    background.add_task(invalidate_settings)
+    background.add_task(
+        write_audit_log, admin.id, "update_setting",
         entity_type="system_settings", details={"key": key},
-    ))
+    )
     return setting
 
 
 @router.put("/telegram-settings")
 async def update_telegram_settings(
     data: TelegramSettings,
+    background: BackgroundTasks,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Update Telegram bot token and chat IDs."""
-    for key, value in [("telegram_bot_token", data.bot_token), ("telegram_chat_ids", data.chat_ids)]:
-        result = await db.execute(select(SystemSettings).where(SystemSettings.key == key))
-        setting = result.scalar_one_or_none()
-        if setting:
-            setting.value = value
-            setting.updated_by = admin.id
-        else:
-            db.add(SystemSettings(key=key, value=value, updated_by=admin.id))
-
-    await db.flush()
-    db.add(AuditLog(
-        admin_id=admin.id, action="update_telegram",
-        entity_type="system_settings",
-    ))
+    # Both keys in one statement
+    await db.execute(_upsert_settings([
+        {"key": "telegram_bot_token", "value": data.bot_token, "updated_by": admin.id},
+        {"key": "telegram_chat_ids", "value": data.chat_ids, "updated_by": admin.id},
+    ]))
+    background.add_task(invalidate_settings)
+    background.add_task(write_audit_log, admin.id, "update_telegram", entity_type="system_settings")
     return {"message": "Telegram sozlamalari yangilandi"}
 
 
@@ -91,37 +102,66 @@ async def telegram_test(
     return {"success": success, "message": message}
 
 
+def _seek(query, model, cursor: Optional[str], offset: int):
+    """Continue after the cursor row (index seek); offset is kept for old clients."""
+    if not cursor:
+        return query.offset(offset)
+    position = decode_cursor(cursor)
+    if position is None:
+        raise HTTPException(status_code=400, detail="Noto'g'ri cursor")
+    return query.where(tuple_(model.created_at, model.id) < tuple_(*position))
+
+
+def _set_next_cursor(response: Response, rows: list, limit: int) -> None:
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+
 # === Feedback ===
 
 @router.get("/feedback", response_model=List[FeedbackOut])
 async def get_feedback_list(
+    response: Response,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     feedback_type: str = Query(None),
+    cursor: Optional[str] = Query(None),
 ):
-    query = select(FeedbackSubmission).order_by(desc(FeedbackSubmission.created_at))
+    """Newest first. Pass the X-Next-Cursor header back as ?cursor= to page."""
+    query = select(FeedbackSubmission).order_by(
+        desc(FeedbackSubmission.created_at), desc(FeedbackSubmission.id)
+    )
     if feedback_type:
         query = query.where(FeedbackSubmission.feedback_type == feedback_type)
-    query = query.offset(offset).limit(limit)
+    query = _seek(query, FeedbackSubmission, cursor, offset).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    rows = result.scalars().all()
+    _set_next_cursor(response, rows, limit)
+    return rows
 
 
 # === Audit Log ===
 
 @router.get("/audit-log", response_model=List[AuditLogOut])
 async def get_audit_log(
+    response: Response,
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     action: str = Query(None),
+    cursor: Optional[str] = Query(None),
 ):
-    query = select(AuditLog).order_by(desc(AuditLog.created_at))
+    """Newest first. Pass the X-Next-Cursor header back as ?cursor= to page."""
+    query = select(AuditLog).order_by(desc(AuditLog.created_at), desc(AuditLog.id))
     if action:
         query = query.where(AuditLog.action == action)
-    query = query.offset(offset).limit(limit)
+    query = _seek(query, AuditLog, cursor, offset).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    rows = result.scalars().all()
+    _set_next_cursor(response, rows, limit)
+    return rows
+
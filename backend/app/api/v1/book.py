@@ -5,7 +5,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 
 from app.models.section import Section
 
@@ -14,7 +14,7 @@ from app.models.book import Book, Chapter, Page, TextUnit
 from app.models.audio import UnitSegmentMapping, AudioSegment
 from app.config import get_settings
 from app.schemas import BookOut, BookSummary, PageOut, TextUnitOut, ChapterOut
-from app.api.deps import get_published_book
+from app.api.deps import get_published_book, UNIT_TYPE_MAP_INV
 
 router = APIRouter(prefix="/book", tags=["Book"])
 settings = get_settings()
@@ -57,11 +57,12 @@ async def get_pages_list(
     )
     pages = result.scalars().all()
 
+    base = settings.MEDIA_BASE_URL
     return [
         {
             "id": p.id,
             "page_number": p.page_number,
-            "image_url": f"{settings.MEDIA_BASE_URL}/{p.image_path}" if p.image_path else None,
+            "image_url": f"{base}/{p.image_path}" if p.image_path else None,
             "has_text_data": p.has_text_data,
             "is_annotated": p.is_annotated,
         }
@@ -82,6 +83,7 @@ async def get_page(
         .options(
             selectinload(Page.text_units),
             selectinload(Page.sections),
+            raiseload("*"),
         )
         .where(Page.book_id == book.id, Page.page_number == page_number)
     )
@@ -89,27 +91,31 @@ async def get_page(
     if not page:
         raise HTTPException(status_code=404, detail="Sahifa topilmadi")
 
-    # Build text units with audio URLs
-    units = []
-    for unit in sorted(page.text_units, key=lambda u: u.sort_order):
-        # Get published audio mapping
+    # Published audio for all of the page's units in one query
+    audio_paths = {}
+    if page.text_units:
         mapping_result = await db.execute(
-            select(UnitSegmentMapping)
-            .options(selectinload(UnitSegmentMapping.audio_segment))
+            select(UnitSegmentMapping.text_unit_id, AudioSegment.file_path)
+            .join(AudioSegment, AudioSegment.id == UnitSegmentMapping.audio_segment_id)
             .where(
-                UnitSegmentMapping.text_unit_id == unit.id,
+                UnitSegmentMapping.text_unit_id.in_([u.id for u in page.text_units]),
                 UnitSegmentMapping.is_published == True,
             )
-            .limit(1)
+            .order_by(UnitSegmentMapping.id)
         )
-        mapping = mapping_result.scalar_one_or_none()
-        audio_url = None
-        if mapping and mapping.audio_segment and mapping.audio_segment.file_path:
-            audio_url = f"{settings.MEDIA_BASE_URL}/{mapping.audio_segment.file_path}"
+        for unit_id, file_path in mapping_result.all():
+            audio_paths.setdefault(unit_id, file_path)
+
+    # Build text units with audio URLs
+    base = settings.MEDIA_BASE_URL
+    units = []
+    for unit in page.text_units:  # already ordered by sort_order
+        file_path = audio_paths.get(unit.id)
+        audio_url = f"{base}/{file_path}" if file_path else None
 
         units.append({
             "id": unit.id,
-            "unit_type": unit.unit_type.value if hasattr(unit.unit_type, 'value') else unit.unit_type,
+            "unit_type": UNIT_TYPE_MAP_INV.get(unit.unit_type, unit.unit_type),
             "text_content": unit.text_content,
             "bbox_x": unit.bbox_x,
             "bbox_y": unit.bbox_y,
@@ -123,7 +129,7 @@ async def get_page(
 
     # Build sections
     sections = []
-    for sec in sorted(page.sections, key=lambda s: s.sort_order):
+    for sec in page.sections:
         sections.append({
             "id": sec.id,
             "section_type": sec.section_type.value if hasattr(sec.section_type, 'value') else sec.section_type,
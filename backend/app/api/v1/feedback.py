@@ -2,13 +2,13 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, AsyncSessionLocal
 from app.models.feedback import FeedbackSubmission
 from app.schemas.feedback import FeedbackCreate, FeedbackOut
-from app.services.telegram import send_feedback_to_telegram
+from app.services.telegram import get_telegram_config, send_feedback_to_telegram
 
 logger = logging.getLogger("muallimi")
 
@@ -19,6 +19,7 @@ router = APIRouter(prefix="/feedback", tags=["Feedback"])
 async def submit_feedback(
     data: FeedbackCreate,
     request: Request,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Submit user feedback. Sends to Telegram if configured."""
@@ -33,16 +34,33 @@ async def submit_feedback(
     db.add(feedback)
     await db.flush()
 
-    # Send to Telegram (non-blocking, don't fail the request)
-    try:
-        success = await send_feedback_to_telegram(feedback, db)
-        feedback.telegram_sent = success
-        if not success:
-            feedback.telegram_error = "Telegram yuborilmadi"
-    except Exception as e:
-        logger.error(f"Telegram error: {e}")
-        feedback.telegram_sent = False
-        feedback.telegram_error = str(e)[:500]
-
-    await db.flush()
+    # Telegram runs after the response: a slow or failing API must not
+    # delay the user or hold this request's connection
+    background.add_task(_send_and_record, feedback.id)
     return feedback
+
+
+async def _send_and_record(feedback_id: int) -> None:
+    """Send a submission to Telegram and record the outcome on its row."""
+    async with AsyncSessionLocal() as db:
+        feedback = await db.get(FeedbackSubmission, feedback_id)
+        if feedback is None:
+            return
+        try:
+            token, chat_ids = await get_telegram_config(db)
+            # End the read transaction so no pooled connection waits on the
+            # HTTP calls (sessions don't expire on commit; feedback stays loaded)
+            await db.commit()
+            success = await send_feedback_to_telegram(feedback, token, chat_ids)
+            feedback.telegram_sent = success
+            if not success:
+                feedback.telegram_error = "Telegram yuborilmadi"
+        except Exception as e:
+            logger.error(f"Telegram error: {e}")
+            feedback.telegram_sent = False
+            feedback.telegram_error = str(e)[:500]
+
+        try:
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Feedback {feedback_id} telegram status not saved: {e}")
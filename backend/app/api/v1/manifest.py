@@ -1,14 +1,15 @@
 """Manifest endpoint with ETag support."""
 
-import hashlib
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Request, Response
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.book import Book, Page, TextUnit
-from app.models.audio import UnitSegmentMapping
+from app.models.book import Book
 from app.models.system import ManifestVersion
+from app.services.cache import dump_json
 from app.config import get_settings
 
 router = APIRouter(tags=["Manifest"])
@@ -18,56 +19,62 @@ settings = get_settings()
 @router.get("/manifest")
 async def get_manifest(request: Request, db: AsyncSession = Depends(get_db)):
     """Get current content manifest with ETag caching."""
-    # Get book
-    result = await db.execute(select(Book).limit(1))
-    book = result.scalar_one_or_none()
-
-    if not book:
+    # Single-row read: counts are stored on the book at publish time
+    result = await db.execute(
+        select(
+            Book.id,
+            Book.manifest_version,
+            Book.pages_count,
+            Book.units_count,
+            Book.segments_count,
+            select(ManifestVersion.published_at)
+            .order_by(ManifestVersion.version.desc())
+            .limit(1)
+            .scalar_subquery(),
+        ).limit(1)
+    )
+    row = result.first()
+    if not row:
         return {"version": 0, "book_id": 0, "total_pages": 0, "total_units": 0, "total_segments": 0}
+    book_id, manifest_version, pages_count, units_count, segments_count, published_at = row
 
-    # Count entities
-    pages_count = await db.scalar(
-        select(func.count(Page.id)).where(Page.book_id == book.id)
-    )
-    units_count = await db.scalar(
-        select(func.count(TextUnit.id)).join(Page).where(Page.book_id == book.id)
-    )
-    segments_count = await db.scalar(
-        select(func.count(UnitSegmentMapping.id)).where(
-            UnitSegmentMapping.is_published == True
-        )
-    )
+    # Weak ETag: the counters already identify the manifest state, no hashing
+    etag = f"v{manifest_version}-p{pages_count}-u{units_count}-s{segments_count}"
 
-    # Latest manifest version
-    mv_result = await db.execute(
-        select(ManifestVersion).order_by(ManifestVersion.version.desc()).limit(1)
-    )
-    mv = mv_result.scalar_one_or_none()
+    # Check If-None-Match
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers={"ETag": f'W/"{etag}"'})
 
     manifest = {
-        "version": book.manifest_version,
-        "book_id": book.id,
+        "version": manifest_version,
+        "book_id": book_id,
         "total_pages": pages_count or 0,
         "total_units": units_count or 0,
         "total_segments": segments_count or 0,
-        "published_at": mv.published_at.isoformat() if mv else None,
+        "published_at": published_at.isoformat() if published_at else None,
         "media_base_url": settings.MEDIA_BASE_URL,
     }
 
-    # Generate ETag
-    etag_content = f"v{book.manifest_version}-p{pages_count}-u{units_count}-s{segments_count}"
-    etag = hashlib.md5(etag_content.encode()).hexdigest()
-
-    # Check If-None-Match
-    if_none_match = request.headers.get("If-None-Match")
-    if if_none_match and if_none_match.strip('"') == etag:
-        return Response(status_code=304, headers={"ETag": f'"{etag}"'})
-
     return Response(
-        content=__import__("json").dumps(manifest),
+        content=dump_json(manifest),
         media_type="application/json",
         headers={
-            "ETag": f'"{etag}"',
+            "ETag": f'W/"{etag}"',
             "Cache-Control": "no-cache",
         },
     )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison (RFC 9110): W/ prefix and quotes ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
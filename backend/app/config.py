@@ -1,6 +1,6 @@
 """Application configuration via environment variables."""
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import List
 
 from pydantic_settings import BaseSettings
@@ -45,15 +45,17 @@ class Settings(BaseSettings):
     MEDIA_DIR: str = "/app/media"
     MAX_UPLOAD_SIZE_MB: int = 100
 
-    @property
+    # Derived values are computed once per Settings instance (settings are
+    # immutable after load and get_settings() returns a singleton)
+    @cached_property
     def allowed_origins_list(self) -> List[str]:
         return [o.strip() for o in self.ALLOWED_ORIGINS.split(",") if o.strip()]
 
-    @property
+    @cached_property
     def telegram_chat_ids_list(self) -> List[str]:
         return [c.strip() for c in self.TELEGRAM_CHAT_IDS.split(",") if c.strip()]
 
-    @property
+    @cached_property
     def sync_database_url(self) -> str:
         if self.DATABASE_URL_SYNC:
             return self.DATABASE_URL_SYNC
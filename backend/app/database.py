@@ -12,7 +12,12 @@ engine = create_async_engine(
     echo=settings.DEBUG,
     pool_size=20,
     max_overflow=10,
+    pool_timeout=10,     # Fail fast with an error instead of queueing for 30s
     pool_pre_ping=True,
+    pool_recycle=1800,   # Replace connections before server/proxy idle timeouts
+    pool_use_lifo=True,  # Reuse the most recently returned (warm) connection
+    # Prepared statements cached per connection (asyncpg dialect, default 100)
+    connect_args={"prepared_statement_cache_size": 512},
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -27,7 +32,14 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncSession:
-    """Dependency that yields an async database session."""
+    """Dependency that yields an async database session.
+
+    The commit runs in the dependency's exit code, which FastAPI (>=0.106)
+    executes before the response is sent, so clients never see a 2xx for
+    an uncommitted transaction and the connection is back in the pool by
+    the time the response is written. Work that should happen after the
+    response belongs in BackgroundTasks with its own session.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -35,5 +47,3 @@ async def get_db() -> AsyncSession:
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
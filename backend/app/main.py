@@ -5,7 +5,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.config import get_settings
 from app.api.v1.router import router as v1_router
@@ -54,6 +54,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down")
+    from app.services.telegram import close_http_client
+    await close_http_client()
 
 
 app = FastAPI(
@@ -63,6 +65,7 @@ app = FastAPI(
     docs_url="/docs" if settings.DEBUG or settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.DEBUG or settings.ENVIRONMENT != "production" else None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -72,6 +75,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Custom middleware
@@ -1,14 +1,33 @@
 """Rate limiting middleware using Redis."""
 
+import logging
 import time
-from typing import Optional
 
-from fastapi import Request, HTTPException, status
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
-# In-memory fallback rate limiter (used when Redis is unavailable)
-_rate_limit_store: dict[str, list] = {}
+from app.services.cache import get_redis
+
+logger = logging.getLogger("muallimi")
+
+# In-memory fallback rate limiter (used when Redis is unavailable):
+# key -> (window end, request count), same fixed-window keys as Redis
+_rate_limit_store: dict[str, tuple[float, int]] = {}
+
+
+def _local_hit(key: str, window_end: float) -> int:
+    """Count a request in this worker's memory; drops finished windows."""
+    entry = _rate_limit_store.get(key)
+    if entry is None:
+        now = time.time()
+        for stale in [k for k, (end, _) in _rate_limit_store.items() if end <= now]:
+            del _rate_limit_store[stale]
+        entry = (window_end, 0)
+    count = entry[1] + 1
+    _rate_limit_store[key] = (entry[0], count)
+    return count
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -21,34 +40,38 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     }
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        path = request.url.path
-        limit_config = None
+        # Only POSTs to the exact endpoints above are limited; everything
+        # else passes straight through without a scan of LIMITS
+        if request.method != "POST":
+            return await call_next(request)
 
-        for pattern, config in self.LIMITS.items():
-            if path.startswith(pattern) and request.method == "POST":
-                limit_config = config
-                break
+        # "/x" and "/x/" share one limit and one counter
+        path = request.url.path.rstrip("/") or request.url.path
+        limit_config = self.LIMITS.get(path)
 
         if limit_config:
             max_requests, window = limit_config
             client_ip = request.client.host if request.client else "unknown"
-            key = f"rl:{path}:{client_ip}"
-
-            now = time.time()
-            if key not in _rate_limit_store:
-                _rate_limit_store[key] = []
+            # Fixed window: one counter per (path, ip, window), shared by all
+            # workers through Redis, expiring with its window
+            window_id = int(time.time() // window)
+            key = f"rl:{path}:{client_ip}:{window_id}"
 
-            # Clean old entries
-            _rate_limit_store[key] = [
-                t for t in _rate_limit_store[key] if t > now - window
-            ]
+            try:
+                pipe = get_redis().pipeline()
+                pipe.incr(key)
+                pipe.expire(key, window)
+                count, _ = await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Rate limit falling back to memory: {e}")
+                count = _local_hit(key, (window_id + 1) * window)
 
-            if len(_rate_limit_store[key]) >= max_requests:
-                raise HTTPException(
+            if count > max_requests:
+                # Returned, not raised: exceptions from BaseHTTPMiddleware
+                # bypass FastAPI's HTTPException handler and become 500s
+                return JSONResponse(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Juda ko'p so'rovlar. Biroz kuting.",
+                    content={"detail": "Juda ko'p so'rovlar. Biroz kuting."},
                 )
 
-            _rate_limit_store[key].append(now)
-
         return await call_next(request)
@@ -4,7 +4,7 @@ import enum
 
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean,
-    DateTime, ForeignKey, Enum, JSON
+    DateTime, ForeignKey, Enum, JSON, LargeBinary
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -35,7 +35,7 @@ class AudioFile(Base):
     # Which pages this audio covers
     page_start = Column(Integer, nullable=True)
     page_end = Column(Integer, nullable=True)
-    waveform_peaks = Column(JSON, nullable=True)  # Array of peak values for visualization
+    waveform_peaks = Column(LargeBinary, nullable=True)  # One byte per peak (0-255), see pack_waveform_peaks
     processing_metadata = Column(JSON, nullable=True)  # FFmpeg output, silence detect results
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -54,7 +54,7 @@ class AudioSegment(Base):
     start_ms = Column(Integer, nullable=False)
     end_ms = Column(Integer, nullable=False)
     duration_ms = Column(Integer, nullable=False)
-    waveform_peaks = Column(JSON, nullable=True)
+    waveform_peaks = Column(LargeBinary, nullable=True)
     is_silence = Column(Boolean, default=False)
     label = Column(String(200), nullable=True)  # Optional label for admin reference
     version = Column(Integer, default=1)
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean,
-    DateTime, ForeignKey, Enum, JSON
+    DateTime, ForeignKey, Enum, JSON, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -39,6 +39,10 @@ class Book(Base):
     author = Column(String(300), nullable=True)
     total_pages = Column(Integer, default=0)
     manifest_version = Column(Integer, default=1)
+    # Manifest counters, refreshed on publish (app/services/manifest.py)
+    pages_count = Column(Integer, default=0)
+    units_count = Column(Integer, default=0)
+    segments_count = Column(Integer, default=0)
     is_published = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -98,6 +102,11 @@ class Page(Base):
     sections = relationship("Section", back_populates="page", cascade="all, delete-orphan", order_by="Section.sort_order")
     versions = relationship("PageVersion", back_populates="page", cascade="all, delete-orphan", order_by="PageVersion.version.desc()")
 
+    __table_args__ = (
+        # Page lookup by number and page lists, both scoped to a book
+        Index("ix_pages_book_page_number", "book_id", "page_number"),
+    )
+
 
 class TextUnit(Base):
     __tablename__ = "text_units"
@@ -123,6 +132,13 @@ class TextUnit(Base):
     page = relationship("Page", back_populates="text_units")
     segment_mappings = relationship("UnitSegmentMapping", back_populates="text_unit", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Page unit listings (ORDER BY sort_order) and split_unit's range shift
+        Index("ix_text_units_page_sort", "page_id", "sort_order"),
+        # Re-analysis deletes only the OCR-generated units of a page
+        Index("ix_text_units_page_auto", "page_id", postgresql_where=(is_manual == False)),
+    )
+
 
 class PageVersion(Base):
     """Snapshot of a page's text_units at publish time for rollback."""
@@ -137,3 +153,7 @@ class PageVersion(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     page = relationship("Page", back_populates="versions")
+
+    __table_args__ = (
+        Index("ix_page_versions_page_version", "page_id", version.desc()),
+    )
@@ -2,7 +2,7 @@
 
 import enum
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, Index
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -26,3 +26,13 @@ class FeedbackSubmission(Base):
     ip_address = Column(String(50), nullable=True)
     user_agent = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Keyset pagination of the admin feedback list (newest first)
+        Index("ix_feedback_submissions_created_id", created_at.desc(), id.desc()),
+        # Same listing filtered by feedback_type
+        Index(
+            "ix_feedback_submissions_type_created_id",
+            feedback_type, created_at.desc(), id.desc(),
+        ),
+    )
@@ -5,8 +5,9 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean,
-    DateTime, ForeignKey, Enum, JSON
+    DateTime, ForeignKey, Enum, Index
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -34,9 +35,16 @@ class Section(Base):
     title_uz = Column(String(300), nullable=True)
     sort_order = Column(Integer, default=0)
     is_manual = Column(Boolean, default=False)
-    unit_ids = Column(JSON, nullable=False, default=list)  # Ordered list of text_unit IDs
+    unit_ids = Column(ARRAY(Integer), nullable=False, default=list)  # Ordered list of text_unit IDs
     bbox_y_start = Column(Float, nullable=True)  # Top boundary (% of page)
     bbox_y_end = Column(Float, nullable=True)    # Bottom boundary (% of page)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     page = relationship("Page", back_populates="sections")
+
+    __table_args__ = (
+        # A page's sections in display order (Page.sections, section lists)
+        Index("ix_sections_page_sort", "page_id", "sort_order"),
+        # auto_section replaces only the generated sections of a page
+        Index("ix_sections_page_auto", "page_id", postgresql_where=(is_manual == False)),
+    )
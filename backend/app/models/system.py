@@ -1,7 +1,7 @@
 """System models: audit log, settings, manifest versioning."""
 
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, ForeignKey, JSON
+    Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 )
 from sqlalchemy.sql import func
 
@@ -20,6 +20,13 @@ class AuditLog(Base):
     ip_address = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of the admin audit log (newest first)
+        Index("ix_audit_logs_created_id", created_at.desc(), id.desc()),
+        # Same listing filtered by action
+        Index("ix_audit_logs_action_created_id", action, created_at.desc(), id.desc()),
+    )
+
 
 class SystemSettings(Base):
     __tablename__ = "system_settings"
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 
 class TextUnitOut(BaseModel):
@@ -18,8 +18,11 @@ class TextUnitOut(BaseModel):
     is_manual: bool
     audio_segment_url: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Built once; routes that pre-serialize unit lists validate and dump with it
+TEXT_UNIT_LIST_ADAPTER = TypeAdapter(List[TextUnitOut])
 
 
 class TextUnitCreate(BaseModel):
@@ -54,8 +57,7 @@ class PageOut(BaseModel):
     is_annotated: bool
     text_units: List[TextUnitOut] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PageSummary(BaseModel):
@@ -66,8 +68,7 @@ class PageSummary(BaseModel):
     is_annotated: bool
     unit_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChapterOut(BaseModel):
@@ -78,8 +79,7 @@ class ChapterOut(BaseModel):
     start_page: Optional[int] = None
     end_page: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChapterCreate(BaseModel):
@@ -101,8 +101,7 @@ class BookOut(BaseModel):
     chapters: List[ChapterOut] = []
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookSummary(BaseModel):
@@ -112,8 +111,7 @@ class BookSummary(BaseModel):
     manifest_version: int
     is_published: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ─── Section schemas ────────────────────────────
@@ -130,8 +128,7 @@ class SectionOut(BaseModel):
     bbox_y_end: Optional[float] = None
     is_manual: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SectionUpdate(BaseModel):
@@ -1,9 +1,17 @@
 """Pydantic schemas for audio-related data."""
 
+import base64
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _encode_peaks(value):
+    """Stored peaks (one byte per peak, 0-255 = 0.0-1.0) go out as base64."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return value
 
 
 class AudioSegmentOut(BaseModel):
@@ -13,13 +21,14 @@ class AudioSegmentOut(BaseModel):
     start_ms: int
     end_ms: int
     duration_ms: int
-    waveform_peaks: Optional[list] = None
+    waveform_peaks: Optional[str] = None  # base64, one byte per peak (0-255)
     is_silence: bool
     label: Optional[str] = None
     version: int
 
-    class Config:
-        from_attributes = True
+    _peaks_b64 = field_validator("waveform_peaks", mode="before")(_encode_peaks)
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AudioSegmentUpdate(BaseModel):
@@ -39,12 +48,13 @@ class AudioFileOut(BaseModel):
     error_message: Optional[str] = None
     page_start: Optional[int] = None
     page_end: Optional[int] = None
-    waveform_peaks: Optional[list] = None
+    waveform_peaks: Optional[str] = None  # base64, one byte per peak (0-255)
     segment_count: int = 0
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    _peaks_b64 = field_validator("waveform_peaks", mode="before")(_encode_peaks)
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SegmentMappingCreate(BaseModel):
@@ -60,5 +70,4 @@ class SegmentMappingOut(BaseModel):
     is_published: bool
     published_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
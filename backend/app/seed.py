@@ -4,6 +4,7 @@ import asyncio
 import logging
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import AsyncSessionLocal
@@ -18,22 +19,32 @@ settings = get_settings()
 async def ensure_admin_user():
     """Create default admin user if not exists."""
     async with AsyncSessionLocal() as db:
+        # Look up first: the common case is "exists", and it skips the
+        # bcrypt hash an unconditional INSERT would have to compute
         result = await db.execute(
-            select(AdminUser).where(AdminUser.username == settings.ADMIN_USERNAME)
+            select(AdminUser.id).where(AdminUser.username == settings.ADMIN_USERNAME)
         )
-        admin = result.scalar_one_or_none()
-
-        if not admin:
-            if not settings.ADMIN_PASSWORD:
-                logger.warning("ADMIN_PASSWORD not set, skipping admin seed")
-                return
-
-            admin = AdminUser(
-                username=settings.ADMIN_USERNAME,
-                password_hash=hash_password(settings.ADMIN_PASSWORD),
-            )
-            db.add(admin)
-            await db.commit()
+        if result.scalar_one_or_none() is not None:
+            logger.info(f"Admin user '{settings.ADMIN_USERNAME}' already exists")
+            return
+
+        if not settings.ADMIN_PASSWORD:
+            logger.warning("ADMIN_PASSWORD not set, skipping admin seed")
+            return
+
+        # bcrypt is CPU-bound: hash in a thread, not on the event loop
+        password_hash = await asyncio.to_thread(hash_password, settings.ADMIN_PASSWORD)
+
+        # ON CONFLICT: workers starting together may all get here
+        result = await db.execute(
+            pg_insert(AdminUser)
+            .values(username=settings.ADMIN_USERNAME, password_hash=password_hash)
+            .on_conflict_do_nothing(index_elements=[AdminUser.username])
+            .returning(AdminUser.id)
+        )
+        created = result.scalar_one_or_none() is not None
+        await db.commit()
+        if created:
             logger.info(f"Admin user '{settings.ADMIN_USERNAME}' created")
         else:
             logger.info(f"Admin user '{settings.ADMIN_USERNAME}' already exists")
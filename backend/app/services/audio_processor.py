@@ -4,15 +4,35 @@ import json
 import logging
 import os
 import subprocess
+import sys
 import re
+import shutil
+import tempfile
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 from app.config import get_settings
+from app.services.cache import cached_by_file_content
 
 logger = logging.getLogger("muallimi")
 settings = get_settings()
 
+WAVEFORM_SAMPLE_RATE = 8000  # Hz, mono s16le for peak extraction
+PCM_READ_BYTES = 1 << 20
+PEAK_LEVEL_RE = re.compile(r"lavfi\.astats\.Overall\.Peak_level=(\S+)")
+# silencedetect prints a slightly negative start for silence at 0
+SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
 
+# Probe / waveform / silence results depend only on the file's bytes
+AUDIO_CACHE_TTL = 7 * 24 * 3600
+
+
+_cached_by_content = cached_by_file_content("audio", ttl=AUDIO_CACHE_TTL)
+
+
+@_cached_by_content
 def get_audio_duration_ms(file_path: str) -> int:
     """Get audio duration in milliseconds using FFprobe."""
     try:
@@ -53,47 +73,146 @@ def normalize_audio(input_path: str, output_path: str) -> bool:
         return False
 
 
-def generate_waveform_peaks(file_path: str, num_samples: int = 1000) -> List[float]:
-    """Generate waveform peak data for visualization using FFmpeg."""
+@_cached_by_content
+def generate_waveform_peaks(
+    file_path: str,
+    num_samples: int = 1000,
+    duration_ms: Optional[int] = None,
+) -> List[float]:
+    """Generate waveform peak data for visualization using FFmpeg.
+
+    FFmpeg's astats filter measures the peak of each chunk itself; if that
+    output can't be used, the PCM is streamed back and reduced in Python.
+    The chunk size per peak comes from the duration (probed when not given).
+    """
+    if not duration_ms:
+        duration_ms = get_audio_duration_ms(file_path)
+    if not duration_ms:
+        logger.error("Waveform generation failed: unknown duration")
+        return []
+    chunk_size = max(1, duration_ms * WAVEFORM_SAMPLE_RATE // 1000 // num_samples)
+
+    peaks = _waveform_peaks_astats(file_path, num_samples, chunk_size)
+    if peaks:
+        return peaks
+    return _waveform_peaks_pcm(file_path, num_samples, chunk_size)
+
+
+def _waveform_peaks_astats(file_path: str, num_samples: int, chunk_size: int) -> Optional[List[float]]:
+    """Per-chunk peaks computed by FFmpeg (asetnsamples + astats).
+
+    Only the printed Peak_level values (dBFS) cross the process boundary.
+    Returns None when FFmpeg fails or prints nothing usable.
+    """
+    audio_filter = (
+        f"aresample={WAVEFORM_SAMPLE_RATE},aformat=channel_layouts=mono,"
+        f"asetnsamples=n={chunk_size}:p=0,"
+        "astats=metadata=1:reset=1,"
+        "ametadata=mode=print:key=lavfi.astats.Overall.Peak_level"
+    )
     try:
-        # Get raw audio samples
         result = subprocess.run(
             [
-                "ffmpeg", "-i", file_path,
-                "-f", "s16le", "-ac", "1", "-ar", "8000",
-                "-",
+                "ffmpeg", "-hide_banner", "-nostats", "-i", file_path,
+                "-af", audio_filter, "-f", "null", "-",
             ],
-            capture_output=True, timeout=120,
+            capture_output=True, text=True, timeout=120,
         )
         if result.returncode != 0:
-            logger.error("Waveform generation failed")
-            return []
+            return None
+
+        peaks = []
+        for match in PEAK_LEVEL_RE.finditer(result.stderr):
+            level_db = float(match.group(1))  # "-inf" for digital silence
+            peaks.append(round(min(1.0, 10 ** (level_db / 20)), 4))
+            if len(peaks) == num_samples:
+                break
+        return peaks or None
+
+    except Exception as e:
+        logger.warning(f"astats waveform failed, falling back to PCM: {e}")
+        return None
 
-        raw_data = result.stdout
-        if not raw_data:
-            return []
 
-        # Convert raw bytes to samples
-        import struct
-        sample_count = len(raw_data) // 2
-        samples = struct.unpack(f"<{sample_count}h", raw_data[:sample_count * 2])
+def _waveform_peaks_pcm(file_path: str, num_samples: int, chunk_size: int) -> List[float]:
+    """Per-chunk peaks from FFmpeg's s16le output, read block by block.
 
-        # Downsample to num_samples peaks
-        chunk_size = max(1, sample_count // num_samples)
+    Memory stays flat however long the file is: only the partial chunk
+    between reads is kept.
+    """
+    try:
+        proc = subprocess.Popen(
+            [
+                "ffmpeg", "-i", file_path,
+                "-f", "s16le", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE),
+                "-",
+            ],
+            # stderr isn't read: a PIPE there could fill up and stall ffmpeg
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 120
         peaks = []
-        for i in range(0, sample_count, chunk_size):
-            chunk = samples[i:i + chunk_size]
-            if chunk:
-                peak = max(abs(s) for s in chunk) / 32768.0
-                peaks.append(round(peak, 4))
+        pending = array("h")  # samples not yet folded into a peak
+        odd_byte = b""
+        reached_eof = False
+        try:
+            while len(peaks) < num_samples:
+                block = proc.stdout.read(PCM_READ_BYTES)
+                if not block:
+                    reached_eof = True
+                    break
+                if time.monotonic() > deadline:
+                    logger.error("Waveform generation timed out")
+                    return []
+
+                block = odd_byte + block
+                even = len(block) // 2 * 2
+                odd_byte = block[even:]
+                samples = array("h", block[:even])
+                if sys.byteorder == "big":
+                    samples.byteswap()
+                pending.extend(samples)
+
+                offset = 0
+                while len(pending) - offset >= chunk_size and len(peaks) < num_samples:
+                    peaks.append(_chunk_peak(pending[offset:offset + chunk_size]))
+                    offset += chunk_size
+                del pending[:offset]
+        finally:
+            # Closing early (enough peaks) ends ffmpeg with a broken pipe
+            proc.stdout.close()
+            try:
+                returncode = proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                returncode = proc.wait()
+
+        if reached_eof and returncode != 0:
+            logger.error("Waveform generation failed")
+            return []
 
-        return peaks[:num_samples]
+        # Trailing partial chunk
+        if pending and len(peaks) < num_samples:
+            peaks.append(_chunk_peak(pending))
+
+        return peaks
 
     except Exception as e:
         logger.error(f"Waveform error: {e}")
         return []
 
 
+def pack_waveform_peaks(peaks: List[float]) -> bytes:
+    """Quantize 0-1 peaks to one byte each (0-255) for storage and transfer."""
+    return bytes(round(min(1.0, max(0.0, p)) * 255) for p in peaks)
+
+
+def _chunk_peak(chunk: array) -> float:
+    """Peak amplitude of int16 samples, 0-1 (max()/min() run in C)."""
+    return round(max(max(chunk), -min(chunk)) / 32768.0, 4)
+
+
+@_cached_by_content
 def detect_silence_boundaries(
     file_path: str,
     silence_threshold: str = "-30dB",
@@ -113,15 +232,15 @@ def detect_silence_boundaries(
             capture_output=True, text=True, timeout=120,
         )
 
+        # One pass in output order; an end only closes a start seen before it
         silences = []
-        start_pattern = re.compile(r"silence_start: ([\d.]+)")
-        end_pattern = re.compile(r"silence_end: ([\d.]+)")
-
-        starts = start_pattern.findall(result.stderr)
-        ends = end_pattern.findall(result.stderr)
-
-        for s, e in zip(starts, ends):
-            silences.append((float(s) * 1000, float(e) * 1000))
+        start = None
+        for kind, value in SILENCE_RE.findall(result.stderr):
+            if kind == "start":
+                start = max(0.0, float(value)) * 1000
+            elif start is not None:
+                silences.append((start, float(value) * 1000))
+                start = None
 
         return silences
 
@@ -213,3 +332,81 @@ def cut_segment_file(
     except Exception as e:
         logger.error(f"Cut segment error: {e}")
         return False
+
+
+def cut_segment_files(
+    source_path: str,
+    cuts: List[Tuple[str, int, int]],
+) -> List[bool]:
+    """Cut several segments concurrently; cuts are (output_path, start_ms, end_ms).
+
+    Each cut is its own FFmpeg process, and the threads only wait on them,
+    so process startup and disk I/O overlap across cores. Results are in
+    the order of cuts.
+    """
+    if not cuts:
+        return []
+    workers = min(len(cuts), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda cut: cut_segment_file(source_path, *cut), cuts))
+
+
+def cut_all_segments(
+    source_path: str,
+    cuts: List[Tuple[str, int, int]],
+) -> List[bool]:
+    """Cut all segments in one FFmpeg run with the segment muxer.
+
+    cuts are (output_path, start_ms, end_ms). The source is split once at
+    every segment start and end; the pieces that are segments are moved to
+    their output paths and the gaps between them dropped. Overlapping
+    cuts, or a failed run, fall back to one FFmpeg process per cut.
+    """
+    if not cuts:
+        return []
+
+    ordered = sorted(cuts, key=lambda cut: cut[1])
+    if (
+        any(start >= end for _, start, end in cuts)
+        or any(prev[2] > nxt[1] for prev, nxt in zip(ordered, ordered[1:]))
+    ):
+        return cut_segment_files(source_path, cuts)
+
+    # Piece i spans [bounds[i], bounds[i + 1])
+    bounds = [0] + sorted({ms for _, start, end in cuts for ms in (start, end)} - {0})
+    piece_of = {ms: i for i, ms in enumerate(bounds)}
+    ext = os.path.splitext(cuts[0][0])[1] or ".mp3"
+
+    os.makedirs(os.path.dirname(cuts[0][0]), exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="cut_", dir=os.path.dirname(cuts[0][0]))
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-y", "-i", source_path,
+                "-f", "segment",
+                "-segment_times", ",".join(f"{ms / 1000.0:.3f}" for ms in bounds[1:]),
+                "-reset_timestamps", "1",
+                "-c", "copy",
+                os.path.join(work_dir, f"piece_%05d{ext}"),
+            ],
+            capture_output=True, text=True, timeout=300,
+        )
+        if result.returncode != 0:
+            logger.warning("Segment muxer failed, cutting segments one by one")
+            return cut_segment_files(source_path, cuts)
+
+        results = []
+        for output_path, start_ms, _end_ms in cuts:
+            piece = os.path.join(work_dir, f"piece_{piece_of[start_ms]:05d}{ext}")
+            if os.path.exists(piece):
+                os.replace(piece, output_path)
+                results.append(True)
+            else:
+                results.append(False)
+        return results
+
+    except Exception as e:
+        logger.error(f"Cut segments error: {e}")
+        return cut_segment_files(source_path, cuts)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,38 @@
+"""Audit log writer for use outside the request transaction."""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models.system import AuditLog
+
+logger = logging.getLogger("muallimi")
+
+
+async def write_audit_log(
+    admin_id: Optional[int],
+    action: str,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    details: Optional[dict] = None,
+) -> None:
+    """Insert one AuditLog row in its own short-lived session.
+
+    Intended for BackgroundTasks: it runs after the response is sent,
+    and a failure here is logged rather than failing the admin action.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            # Core INSERT: no ORM object, flush or RETURNING for a write-only row
+            await db.execute(insert(AuditLog).values(
+                admin_id=admin_id,
+                action=action,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                details=details,
+            ))
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Audit log write failed ({action}): {e}")
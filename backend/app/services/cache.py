@@ -0,0 +1,162 @@
+"""Redis cache-aside helpers for admin read endpoints.
+
+Values are stored as ready-to-send JSON bytes, so a hit is returned
+without touching the database or re-serializing. Redis errors are
+logged and treated as a miss: the cache never fails a request.
+
+Workers use the sync helpers, including cached_by_file_content for
+results that depend only on an input file's bytes (FFmpeg, OCR).
+"""
+
+import functools
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Optional
+
+import orjson
+
+from app.config import get_settings
+
+logger = logging.getLogger("muallimi")
+settings = get_settings()
+
+PAGES_CACHE_TTL = 60  # seconds; writes also delete the keys explicitly
+FILE_READ_BYTES = 1 << 20
+
+_redis = None
+_redis_sync = None
+
+
+def pages_key(book_id: int) -> str:
+    """Key of the admin pages list (GET /admin/book/pages)."""
+    return f"pages:book:{book_id}"
+
+
+def versions_key(page_id: int) -> str:
+    """Key of a page's published versions list."""
+    return f"versions:page:{page_id}"
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize like the app's default ORJSONResponse does."""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_redis():
+    """Shared async Redis client, created on first use.
+
+    Short timeouts keep a down Redis from stalling requests: callers
+    treat errors as a miss and carry on.
+    """
+    global _redis
+    if _redis is None:
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(
+            settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5,
+        )
+    return _redis
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    try:
+        return await get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed ({key}): {e}")
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int = PAGES_CACHE_TTL) -> None:
+    try:
+        await get_redis().set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache set failed ({key}): {e}")
+
+
+async def cache_delete(*keys: str) -> None:
+    try:
+        await get_redis().delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed ({keys}): {e}")
+
+
+def get_redis_sync():
+    """Shared sync Redis client for Celery workers (sync context)."""
+    global _redis_sync
+    if _redis_sync is None:
+        import redis
+        _redis_sync = redis.Redis.from_url(
+            settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5,
+        )
+    return _redis_sync
+
+
+def cache_get_sync(key: str) -> Optional[bytes]:
+    try:
+        return get_redis_sync().get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed ({key}): {e}")
+        return None
+
+
+def cache_set_sync(key: str, value: bytes, ttl: int = PAGES_CACHE_TTL) -> None:
+    try:
+        get_redis_sync().set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache set failed ({key}): {e}")
+
+
+def cache_delete_sync(*keys: str) -> None:
+    """Invalidate from Celery workers (sync context)."""
+    try:
+        get_redis_sync().delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed ({keys}): {e}")
+
+
+@functools.lru_cache(maxsize=64)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    """BLAKE2b of a file's content; (size, mtime) in the key catch rewrites."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(FILE_READ_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_by_file_content(
+    namespace: str,
+    ttl: int,
+    load: Optional[Callable] = None,
+    cache_if: Callable[[Any], bool] = bool,
+):
+    """Memoize fn(file_path, ...) in Redis, keyed by the file's content hash.
+
+    Re-processing the same file (retries, re-imports) then skips the work.
+    ``load`` rebuilds the result from its decoded JSON (e.g. dataclasses).
+    Only results passing ``cache_if`` are stored; by default empty results
+    (the functions' failure value) aren't cached.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(file_path: str, *args, **kwargs):
+            try:
+                st = os.stat(file_path)
+                content = _file_digest(file_path, st.st_size, st.st_mtime_ns)
+            except OSError:
+                return fn(file_path, *args, **kwargs)
+
+            key = f"{namespace}:{fn.__name__}:{content}:{args!r}:{sorted(kwargs.items())!r}"
+            cached = cache_get_sync(key)
+            if cached is not None:
+                data = orjson.loads(cached)
+                return load(data) if load else data
+
+            result = fn(file_path, *args, **kwargs)
+            if cache_if(result):
+                cache_set_sync(key, dump_json(result), ttl=ttl)
+            return result
+
+        return wrapper
+
+    return decorator
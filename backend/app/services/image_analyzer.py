@@ -7,6 +7,7 @@ Uses Tesseract for OCR with Arabic language support.
 Designed to be swappable with Google Cloud Vision later.
 """
 
+import functools
 import os
 import re
 import logging
@@ -14,10 +15,16 @@ from typing import List, Optional
 from dataclasses import dataclass, asdict
 
 from app.config import get_settings
+from app.services.cache import cached_by_file_content
 
 logger = logging.getLogger("muallimi")
 settings = get_settings()
 
+# Tesseract's OpenMP threading costs more than it gains on single page
+# images and oversubscribes cores when several analyses run at once.
+# The tesseract subprocess spawned by pytesseract inherits this.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 # Arabic diacritics (tashkeel) Unicode range
 ARABIC_DIACRITICS = set([
     '\u064B',  # FATHATAN (tanwin fatha)
@@ -34,6 +41,25 @@ ARABIC_DIACRITICS = set([
     '\u0670',  # SUPERSCRIPT ALEF
 ])
 
+# The same sets as compiled character classes: scanning a string with a
+# regex runs in C instead of a per-character set probe in Python
+_DIACRITICS_RE = re.compile("[" + "".join(sorted(ARABIC_DIACRITICS)) + "]")
+_ARABIC_BLOCK_RE = re.compile(r"[\u0600-\u06FF]")
+_ARABIC_LETTER_RANGES_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F]")
+# Lines made only of dashes/decorations
+_DIVIDER_RE = re.compile(r'^[\s\-–—═━─│┃\*\.•]+$')
+
+# Tesseract settings. They, and OCR_CACHE_VERSION (bump it when the
+# grouping/classification below changes), are part of the OCR cache key.
+TESSERACT_LANG = "ara"
+TESSERACT_CONFIG = "--psm 6 --oem 3"
+OCR_CACHE_VERSION = 1
+OCR_CACHE_TTL = 30 * 24 * 3600
+
+# Spacing between consecutive sort_order values of analyzed units, so later
+# edits (unit splits) can slot new units into the gap without renumbering.
+SORT_ORDER_STEP = 1024
+
 
 @dataclass
 class AnalyzedUnit:
@@ -57,14 +83,22 @@ class AnalyzedUnit:
 
 def has_arabic_diacritics(text: str) -> bool:
     """Check if text contains Arabic diacritical marks."""
-    return any(c in ARABIC_DIACRITICS for c in text)
+    return _DIACRITICS_RE.search(text) is not None
 
 
 def count_diacritics(text: str) -> int:
     """Count Arabic diacritical marks in text."""
-    return sum(1 for c in text if c in ARABIC_DIACRITICS)
+    return len(_DIACRITICS_RE.findall(text))
 
 
+def has_arabic(text: str) -> bool:
+    """Check if text contains any character of the Arabic block (U+0600-U+06FF)."""
+    return _ARABIC_BLOCK_RE.search(text) is not None
+
+
+# Pure function of short, heavily repeated OCR tokens (single letters,
+# common words), so results are memoized
+@functools.lru_cache(maxsize=4096)
 def classify_unit_type(text: str, word_count: int) -> str:
     """Classify a text fragment into a unit type based on content.
 
@@ -80,14 +114,14 @@ def classify_unit_type(text: str, word_count: int) -> str:
         return "divider"
 
     # Check if it's a divider (only non-letter chars)
-    if re.match(r'^[\s\-–—═━─│┃\*\.•]+$', stripped):
+    if _DIVIDER_RE.match(stripped):
         return "divider"
 
-    # Count base Arabic letters (excluding diacritics)
-    base_chars = [c for c in stripped if c not in ARABIC_DIACRITICS and c != ' ']
-    arabic_letters = [c for c in base_chars if '\u0600' <= c <= '\u06FF' or '\u0750' <= c <= '\u077F']
+    # Count base Arabic letters (excluding diacritics, which all lie
+    # inside the matched ranges)
+    arabic_letters = len(_ARABIC_LETTER_RANGES_RE.findall(stripped)) - count_diacritics(stripped)
 
-    if len(arabic_letters) <= 2 and word_count <= 1:
+    if arabic_letters <= 2 and word_count <= 1:
         return "letter"
     elif word_count <= 1:
         return "word"
@@ -97,6 +131,11 @@ def classify_unit_type(text: str, word_count: int) -> str:
         return "sentence"
 
 
+@cached_by_file_content(
+    f"ocr:{TESSERACT_LANG}:{TESSERACT_CONFIG}:v{OCR_CACHE_VERSION}",
+    ttl=OCR_CACHE_TTL,
+    load=lambda rows: [AnalyzedUnit(**row) for row in rows],
+)
 def analyze_image_tesseract(image_path: str) -> List[AnalyzedUnit]:
     """Analyze a page image using Tesseract OCR.
 
@@ -115,63 +154,60 @@ def analyze_image_tesseract(image_path: str) -> List[AnalyzedUnit]:
         return []
 
     try:
-        img = Image.open(image_path)
-        img_width, img_height = img.size
+        # Only the header is read here; pixels are never decoded in Python
+        with Image.open(image_path) as img:
+            img_width, img_height = img.size
 
         # Run Tesseract with Arabic language
         # PSM 6 = Assume a single uniform block of text
         # OEM 3 = Default (LSTM + Legacy)
+        # Given a path, pytesseract hands the file straight to tesseract
+        # instead of re-encoding a PIL image into a temp file first.
         data = pytesseract.image_to_data(
-            img,
-            lang='ara',
-            config='--psm 6 --oem 3',
+            image_path,
+            lang=TESSERACT_LANG,
+            config=TESSERACT_CONFIG,
             output_type=pytesseract.Output.DICT
         )
 
         units = []
-        current_line = []
-        current_line_num = -1
         sort_idx = 0
 
-        n_boxes = len(data['text'])
-
-        # Group words by line
+        # Group words by line in one pass over the columns, keeping each
+        # line's running bbox and confidence sum:
+        # line_num -> [texts, left, top, right, bottom, conf_sum]
         lines = {}
-        for i in range(n_boxes):
-            text = data['text'][i].strip()
+        for text, line_num, left, top, width, height, conf in zip(
+            data['text'], data['line_num'], data['left'], data['top'],
+            data['width'], data['height'], data['conf'],
+        ):
+            text = text.strip()
             if not text:
                 continue
 
-            line_num = data['line_num'][i]
-            conf = float(data['conf'][i]) / 100.0  # Normalize to 0-1
-
-            if line_num not in lines:
-                lines[line_num] = []
-
-            lines[line_num].append({
-                'text': text,
-                'left': data['left'][i],
-                'top': data['top'][i],
-                'width': data['width'][i],
-                'height': data['height'][i],
-                'conf': max(0, conf),
-            })
-
-        # Process each line
-        for line_num in sorted(lines.keys()):
-            words = lines[line_num]
-            if not words:
+            conf = max(0, float(conf) / 100.0)  # Normalize to 0-1
+            line = lines.get(line_num)
+            if line is None:
+                lines[line_num] = [[text], left, top, left + width, top + height, conf]
                 continue
+            line[0].append(text)
+            if left < line[1]:
+                line[1] = left
+            if top < line[2]:
+                line[2] = top
+            if left + width > line[3]:
+                line[3] = left + width
+            if top + height > line[4]:
+                line[4] = top + height
+            line[5] += conf
 
-            # Calculate line bounding box
-            min_left = min(w['left'] for w in words)
-            min_top = min(w['top'] for w in words)
-            max_right = max(w['left'] + w['width'] for w in words)
-            max_bottom = max(w['top'] + w['height'] for w in words)
-            avg_conf = sum(w['conf'] for w in words) / len(words)
+        # Process each line
+        for line_num in sorted(lines):
+            texts, min_left, min_top, max_right, max_bottom, conf_sum = lines[line_num]
+            word_count = len(texts)
+            avg_conf = conf_sum / word_count
 
-            line_text = ' '.join(w['text'] for w in words)
-            word_count = len(words)
+            line_text = ' '.join(texts)
 
             # Classify unit type
             unit_type = classify_unit_type(line_text, word_count)
@@ -190,7 +226,7 @@ def analyze_image_tesseract(image_path: str) -> List[AnalyzedUnit]:
                 bbox_w=round(bbox_w, 2),
                 bbox_h=round(bbox_h, 2),
                 confidence=round(avg_conf, 3),
-                sort_order=sort_idx,
+                sort_order=sort_idx * SORT_ORDER_STEP,
                 metadata={
                     'word_count': word_count,
                     'has_diacritics': has_arabic_diacritics(line_text),
@@ -228,3 +264,4 @@ def analyze_image(image_path: str, engine: str = "tesseract") -> List[AnalyzedUn
     else:
         logger.error(f"Unknown OCR engine: {engine}")
         return []
+
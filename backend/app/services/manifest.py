@@ -0,0 +1,36 @@
+"""Manifest counters stored on the Book row.
+
+The manifest reports a book's page, unit and published-segment counts.
+Instead of counting three tables on every request, the counts are
+written to Book.pages_count/units_count/segments_count when the book is
+published (and seeded), so the manifest is a single-row read.
+"""
+
+from sqlalchemy import select, func
+
+from app.models.book import Page, TextUnit
+from app.models.audio import UnitSegmentMapping
+
+
+def manifest_counter_values(book_id: int) -> dict:
+    """Column values for update(Book): the counts as scalar subqueries."""
+    return {
+        "pages_count": (
+            select(func.count(Page.id))
+            .where(Page.book_id == book_id)
+            .scalar_subquery()
+        ),
+        # Semi-join on the book's page ids: served from the
+        # (page_id, sort_order) index, no join against pages rows
+        "units_count": (
+            select(func.count())
+            .select_from(TextUnit)
+            .where(TextUnit.page_id.in_(select(Page.id).where(Page.book_id == book_id)))
+            .scalar_subquery()
+        ),
+        "segments_count": (
+            select(func.count(UnitSegmentMapping.id))
+            .where(UnitSegmentMapping.is_published == True)
+            .scalar_subquery()
+        ),
+    }
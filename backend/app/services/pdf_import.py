@@ -2,13 +2,20 @@
 
 import os
 import logging
+import tempfile
 from typing import List, Tuple, Optional
 
 from app.config import get_settings
+from app.services.cache import cached_by_file_content
 
 logger = logging.getLogger("muallimi")
 settings = get_settings()
 
+RENDER_LOG_EVERY = 10  # pages between render progress log lines
+
+# Text extraction depends only on the PDF's bytes and the page number
+PDF_TEXT_CACHE_TTL = 30 * 24 * 3600
+
 
 def render_pdf_pages(pdf_path: str, output_dir: str, dpi: int = 300) -> List[dict]:
     """
@@ -16,36 +23,98 @@ def render_pdf_pages(pdf_path: str, output_dir: str, dpi: int = 300) -> List[dic
     Returns list of dicts with page_number, image_path, width, height.
     """
     from pdf2image import convert_from_path
+    from PIL import Image
 
     os.makedirs(output_dir, exist_ok=True)
 
     pages_info = []
-    images = convert_from_path(pdf_path, dpi=dpi)
-
-    for i, img in enumerate(images, start=1):
-        # Save standard resolution
-        filename = f"page_{i:03d}.webp"
-        filepath = os.path.join(output_dir, filename)
-        img.save(filepath, "WEBP", quality=90)
-
-        # Save 2x resolution (already at high DPI)
-        filename_2x = f"page_{i:03d}_2x.webp"
-        filepath_2x = os.path.join(output_dir, filename_2x)
-        img.save(filepath_2x, "WEBP", quality=95)
-
-        pages_info.append({
-            "page_number": i,
-            "image_path": f"pages/{filename}",
-            "image_2x_path": f"pages/{filename_2x}",
-            "width": img.width,
-            "height": img.height,
-        })
+    with tempfile.TemporaryDirectory(prefix="pdf_render_") as tmp_dir:
+        # pdftoppm writes the pages to disk (several in parallel) and only
+        # the paths come back, so one decoded page is held at a time
+        # instead of the whole book.
+        ppm_paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            output_folder=tmp_dir,
+            fmt="ppm",
+            thread_count=max((os.cpu_count() or 1) // 2, 1),
+            paths_only=True,
+        )
+
+        for i, ppm_path in enumerate(ppm_paths, start=1):
+            with Image.open(ppm_path) as img:
+                # 2x is the render itself (already at high DPI). method=4 is spelled
+                # out so the encoder never drifts to the ~3x slower method=6.
+                base = f"page_{i:03d}"
+                filename_2x = f"{base}_2x.webp"
+                filepath_2x = os.path.join(output_dir, filename_2x)
+                img.save(filepath_2x, "WEBP", quality=90, method=4)
+
+                # Standard resolution: half-size resample of the same render
+                filename = f"{base}.webp"
+                filepath = os.path.join(output_dir, filename)
+                with img.resize((img.width // 2, img.height // 2), Image.LANCZOS) as img_1x:
+                    img_1x.save(filepath, "WEBP", quality=85, method=4)
+
+                pages_info.append({
+                    "page_number": i,
+                    "image_path": f"pages/{filename}",
+                    "image_2x_path": f"pages/{filename_2x}",
+                    "width": img.width,
+                    "height": img.height,
+                })
+            os.unlink(ppm_path)
 
-        logger.info(f"Rendered page {i}/{len(images)}")
+            # Progress every 10 pages, not a log line per page
+            if i % RENDER_LOG_EVERY == 0 or i == len(ppm_paths):
+                logger.info(f"Rendered page {i}/{len(ppm_paths)}")
 
     return pages_info
 
 
+def _page_text_units(page) -> List[dict]:
+    """Word units of one pdfplumber page, bboxes as page percentages."""
+    units = []
+    page_width = page.width
+    page_height = page.height
+
+    # Extract words with bounding boxes
+    words = page.extract_words(
+        x_tolerance=3,
+        y_tolerance=3,
+        keep_blank_chars=False,
+        use_text_flow=True,
+    )
+
+    for idx, word in enumerate(words):
+        if not word.get("text", "").strip():
+            continue
+
+        # Convert absolute coords to percentages
+        x0 = word["x0"]
+        top = word["top"]
+        x1 = word["x1"]
+        bottom = word["bottom"]
+
+        bbox_x = (x0 / page_width) * 100
+        bbox_y = (top / page_height) * 100
+        bbox_w = ((x1 - x0) / page_width) * 100
+        bbox_h = ((bottom - top) / page_height) * 100
+
+        units.append({
+            "text_content": word["text"],
+            "unit_type": "word",
+            "bbox_x": round(bbox_x, 2),
+            "bbox_y": round(bbox_y, 2),
+            "bbox_w": round(bbox_w, 2),
+            "bbox_h": round(bbox_h, 2),
+            "sort_order": idx,
+        })
+
+    return units
+
+
+@cached_by_file_content("pdf_text:v1", ttl=PDF_TEXT_CACHE_TTL)
 def extract_text_units(pdf_path: str, page_number: int) -> List[dict]:
     """
     Extract text with bounding boxes from a PDF page using pdfplumber.
@@ -53,51 +122,46 @@ def extract_text_units(pdf_path: str, page_number: int) -> List[dict]:
     """
     import pdfplumber
 
-    units = []
-
     try:
         with pdfplumber.open(pdf_path) as pdf:
             if page_number < 1 or page_number > len(pdf.pages):
                 return []
+            return _page_text_units(pdf.pages[page_number - 1])
+    except Exception as e:
+        logger.error(f"Text extraction failed for page {page_number}: {e}")
+        return []
 
-            page = pdf.pages[page_number - 1]
-            page_width = page.width
-            page_height = page.height
-
-            # Extract words with bounding boxes
-            words = page.extract_words(
-                x_tolerance=3,
-                y_tolerance=3,
-                keep_blank_chars=False,
-                use_text_flow=True,
-            )
-
-            for idx, word in enumerate(words):
-                if not word.get("text", "").strip():
-                    continue
-
-                # Convert absolute coords to percentages
-                x0 = word["x0"]
-                top = word["top"]
-                x1 = word["x1"]
-                bottom = word["bottom"]
-
-                bbox_x = (x0 / page_width) * 100
-                bbox_y = (top / page_height) * 100
-                bbox_w = ((x1 - x0) / page_width) * 100
-                bbox_h = ((bottom - top) / page_height) * 100
-
-                units.append({
-                    "text_content": word["text"],
-                    "unit_type": "word",
-                    "bbox_x": round(bbox_x, 2),
-                    "bbox_y": round(bbox_y, 2),
-                    "bbox_w": round(bbox_w, 2),
-                    "bbox_h": round(bbox_h, 2),
-                    "sort_order": idx,
-                })
 
+def _all_pages_extracted(pages_units: List[Optional[List[dict]]]) -> bool:
+    # A page that failed may succeed on the next run; don't pin the gap
+    return bool(pages_units) and all(units is not None for units in pages_units)
+
+
+@cached_by_file_content("pdf_text_all:v2", ttl=PDF_TEXT_CACHE_TTL, cache_if=_all_pages_extracted)
+def extract_all_text_units(pdf_path: str) -> List[Optional[List[dict]]]:
+    """
+    Extract text units of every page, opening and parsing the PDF once.
+    Returns one list per page (index 0 = page 1), as extract_text_units,
+    or None for a page whose extraction failed. Results with a failed page
+    aren't cached.
+    """
+    import pdfplumber
+
+    pages_units = []
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_number, page in enumerate(pdf.pages, start=1):
+                try:
+                    pages_units.append(_page_text_units(page))
+                except Exception as e:
+                    logger.error(f"Text extraction failed for page {page_number}: {e}")
+                    pages_units.append(None)
+                # Drop the page's parsed objects before the next one
+                page.close()
     except Exception as e:
-        logger.error(f"Text extraction failed for page {page_number}: {e}")
+        logger.error(f"Text extraction failed for {pdf_path}: {e}")
+        # The page being read when the document failed; also marks the
+        # result as incomplete so it isn't cached
+        pages_units.append(None)
 
-    return units
+    return pages_units
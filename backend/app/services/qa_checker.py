@@ -5,13 +5,17 @@ Checks: unit count, diacritics, overlaps, duplicates, empty hitboxes, audio cove
 """
 
 import logging
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 
-from app.services.image_analyzer import has_arabic_diacritics, count_diacritics
+from app.services.image_analyzer import has_arabic, has_arabic_diacritics, count_diacritics
 
 logger = logging.getLogger("muallimi")
 
+# Grid cell size (% of the page) for the overlap check
+OVERLAP_CELL = 10
+
 
 @dataclass
 class QAResult:
@@ -45,17 +49,17 @@ def check_diacritics_presence(units: List[dict]) -> dict:
 
     for u in units:
         text = u.get("text_content", "")
-        # Check if text has Arabic characters
-        has_arabic = any('\u0600' <= c <= '\u06FF' for c in text)
-        if has_arabic:
+        # Diacritics lie inside the Arabic block, so a hit answers both
+        # questions with one scan (the common case on this book's pages)
+        if has_arabic_diacritics(text):
+            total_arabic_units += 1
+            units_with_diacritics += 1
+        elif has_arabic(text):
             total_arabic_units += 1
-            if has_arabic_diacritics(text):
-                units_with_diacritics += 1
-            else:
-                units_missing_diacritics.append({
-                    "sort_order": u.get("sort_order", 0),
-                    "text": text[:50],
-                })
+            units_missing_diacritics.append({
+                "sort_order": u.get("sort_order", 0),
+                "text": text[:50],
+            })
 
     if total_arabic_units == 0:
         return {
@@ -82,35 +86,55 @@ def check_diacritics_presence(units: List[dict]) -> dict:
 
 
 def check_overlaps(units: List[dict]) -> dict:
-    """Check for overlapping bounding boxes."""
-    overlaps = []
-
-    for i, u1 in enumerate(units):
-        for j, u2 in enumerate(units):
-            if i >= j:
-                continue
-            # Check if boxes overlap significantly (>30% area)
-            x1, y1, w1, h1 = u1.get("bbox_x", 0), u1.get("bbox_y", 0), u1.get("bbox_w", 0), u1.get("bbox_h", 0)
-            x2, y2, w2, h2 = u2.get("bbox_x", 0), u2.get("bbox_y", 0), u2.get("bbox_w", 0), u2.get("bbox_h", 0)
-
-            # Skip if no bbox set
-            if w1 == 0 or w2 == 0:
-                continue
-
-            overlap_x = max(0, min(x1 + w1, x2 + w2) - max(x1, x2))
-            overlap_y = max(0, min(y1 + h1, y2 + h2) - max(y1, y2))
-            overlap_area = overlap_x * overlap_y
-
-            area1 = w1 * h1
-            area2 = w2 * h2
-            min_area = min(area1, area2) if min(area1, area2) > 0 else 1
-
-            if overlap_area / min_area > 0.3:
-                overlaps.append({
-                    "unit_a": u1.get("sort_order", i),
-                    "unit_b": u2.get("sort_order", j),
-                    "overlap_ratio": round(overlap_area / min_area, 2),
-                })
+    """Check for overlapping bounding boxes.
+
+    Boxes are bucketed into a grid of OVERLAP_CELL-sized cells (bbox values
+    are page percentages), and only boxes sharing a cell are compared,
+    instead of every pair of units.
+    """
+    grid = defaultdict(list)
+    boxes = {}
+    for i, u in enumerate(units):
+        x, y = u.get("bbox_x", 0), u.get("bbox_y", 0)
+        w, h = u.get("bbox_w", 0), u.get("bbox_h", 0)
+        # Skip if no bbox set (a zero/negative side never overlaps)
+        if w <= 0 or h <= 0:
+            continue
+        boxes[i] = (x, y, w, h)
+        for cx in range(int(x // OVERLAP_CELL), int((x + w) // OVERLAP_CELL) + 1):
+            for cy in range(int(y // OVERLAP_CELL), int((y + h) // OVERLAP_CELL) + 1):
+                grid[(cx, cy)].append(i)
+
+    # Two overlapping boxes share an interior point, hence a cell
+    candidates = set()
+    for cell in grid.values():
+        for a in range(len(cell)):
+            for b in range(a + 1, len(cell)):
+                candidates.add((cell[a], cell[b]))  # indices ascend within a cell
+
+    found = []
+    for i, j in candidates:
+        x1, y1, w1, h1 = boxes[i]
+        x2, y2, w2, h2 = boxes[j]
+        # Check if boxes overlap significantly (>30% area)
+        overlap_x = max(0, min(x1 + w1, x2 + w2) - max(x1, x2))
+        overlap_y = max(0, min(y1 + h1, y2 + h2) - max(y1, y2))
+        overlap_area = overlap_x * overlap_y
+
+        min_area = min(w1 * h1, w2 * h2)
+        if overlap_area / min_area > 0.3:
+            found.append((i, j, round(overlap_area / min_area, 2)))
+
+    # Report in unit order, as the pairwise scan did
+    found.sort()
+    overlaps = [
+        {
+            "unit_a": units[i].get("sort_order", i),
+            "unit_b": units[j].get("sort_order", j),
+            "overlap_ratio": ratio,
+        }
+        for i, j, ratio in found
+    ]
 
     passed = len(overlaps) == 0
     return {
@@ -124,27 +148,29 @@ def check_overlaps(units: List[dict]) -> dict:
 def check_duplicates(units: List[dict]) -> dict:
     """Check for duplicate text content."""
     seen = {}
-    duplicates = []
+    duplicates = []  # (index of first occurrence, index of repeat, text)
 
-    for u in units:
-        text = u.get("text_content", "").strip()
+    for i, u in enumerate(units):
+        text = (u.get("text_content") or "").strip()
         if not text:
             continue
-        if text in seen:
-            duplicates.append({
-                "text": text[:50],
-                "sort_order_a": seen[text],
-                "sort_order_b": u.get("sort_order", 0),
-            })
-        else:
-            seen[text] = u.get("sort_order", 0)
+        first = seen.setdefault(text, i)
+        if first != i:
+            duplicates.append((first, i, text))
 
     passed = len(duplicates) == 0
     return {
         "name": "no_duplicates",
         "passed": passed,
         "message": f"{len(duplicates)} ta dublikat topildi" if not passed else "Dublikat yo'q",
-        "details": {"duplicates": duplicates[:10]},
+        "details": {"duplicates": [
+            {
+                "text": text[:50],
+                "sort_order_a": units[a].get("sort_order", 0),
+                "sort_order_b": units[b].get("sort_order", 0),
+            }
+            for a, b, text in duplicates[:10]
+        ]},
     }
 
 
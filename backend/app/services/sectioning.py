@@ -8,6 +8,8 @@ Output: list of Section dicts ready for DB insertion.
 import unicodedata
 import re
 from collections import Counter
+from itertools import chain, islice
+from operator import itemgetter
 from typing import List, Dict, Optional, Tuple
 
 
@@ -21,6 +23,10 @@ def strip_diacritics(text: str) -> str:
     return _DIACRITICS_RE.sub('', text)
 
 
+# Same ranges as is_arabic_letter
+_ARABIC_LETTER_RE = re.compile(r'[\u0621-\u064A\u0671-\u06FF]')
+
+
 def is_arabic_letter(ch: str) -> bool:
     """Check if a character is a base Arabic letter."""
     return '\u0621' <= ch <= '\u064A' or '\u0671' <= ch <= '\u06FF'
@@ -28,8 +34,8 @@ def is_arabic_letter(ch: str) -> bool:
 
 def extract_arabic_letters(text: str) -> List[str]:
     """Extract base Arabic letters from text (no diacritics)."""
-    clean = strip_diacritics(text)
-    return [ch for ch in clean if is_arabic_letter(ch)]
+    # The letter ranges exclude every diacritic, so no strip pass is needed
+    return _ARABIC_LETTER_RE.findall(text)
 
 
 def count_chars(text: str) -> int:
@@ -94,33 +100,31 @@ def _segment_by_y_axis(units: List[dict], gap_threshold: float = 5.0) -> List[Li
     if not units:
         return []
 
-    # Sort by Y position
-    sorted_units = sorted(units, key=lambda u: u['bbox_y'])
+    # Sort by Y position (stable; callers usually pass presorted units,
+    # which timsort handles in a single linear pass)
+    sorted_units = sorted(units, key=itemgetter('bbox_y'))
     
     blocks = []
     current_block = [sorted_units[0]]
+    prev_bottom = sorted_units[0]['bbox_y'] + sorted_units[0]['bbox_h']
     
-    for i in range(1, len(sorted_units)):
-        prev = sorted_units[i - 1]
-        curr = sorted_units[i]
-        
-        prev_bottom = prev['bbox_y'] + prev['bbox_h']
+    for curr in islice(sorted_units, 1, None):
         curr_top = curr['bbox_y']
         gap = curr_top - prev_bottom
+        prev_bottom = curr_top + curr['bbox_h']
         
-        # Check for explicit divider units
-        is_divider = curr.get('unit_type') == 'divider'
-        
-        if gap > gap_threshold or is_divider:
-            if is_divider:
-                # Save current block, add divider as its own block, start new
-                if current_block:
-                    blocks.append(current_block)
-                blocks.append([curr])
-                current_block = []
-            else:
+        # Explicit divider units: save current block, add divider as its
+        # own block, start new
+        if curr.get('unit_type') == 'divider':
+            if current_block:
+                blocks.append(current_block)
+            blocks.append([curr])
+            current_block = []
+        elif gap > gap_threshold:
+            # After a divider the current block may still be empty
+            if current_block:
                 blocks.append(current_block)
-                current_block = [curr]
+            current_block = [curr]
         else:
             current_block.append(curr)
     
@@ -132,9 +136,17 @@ def _segment_by_y_axis(units: List[dict], gap_threshold: float = 5.0) -> List[Li
 
 # ─── Block classification ──────────────────────────────────
 
-def _classify_block(block: List[dict], block_index: int, total_blocks: int) -> str:
+def _classify_block(
+    block: List[dict],
+    block_index: int,
+    total_blocks: int,
+    letters: Dict[int, List[str]],
+) -> str:
     """
     Classify a block of units into a section type.
+
+    ``letters`` maps unit id to its extracted Arabic letters (computed once
+    per page in auto_section_page).
     
     Heuristics (priority order):
     1. Divider — single divider-type unit
@@ -154,7 +166,7 @@ def _classify_block(block: List[dict], block_index: int, total_blocks: int) -> s
     
     unit_types = [u.get('unit_type', 'letter') for u in block]
     texts = [u.get('text_content', '') for u in block]
-    char_counts = [count_chars(t) for t in texts]
+    char_counts = [len(letters[u['id']]) for u in block]
     
     sentence_count = unit_types.count('sentence')
     letter_count = unit_types.count('letter')
@@ -180,7 +192,7 @@ def _classify_block(block: List[dict], block_index: int, total_blocks: int) -> s
 
     # 4. Letter introduction — 1-3 large single letters
     if total <= 5:
-        single_letters = [u for u in block if count_chars(u.get('text_content', '')) == 1]
+        single_letters = [u for u, c in zip(block, char_counts) if c == 1]
         if single_letters and len(single_letters) >= total * 0.5:
             heights = [u['bbox_h'] for u in single_letters]
             max_h = max(heights) if heights else 0
@@ -189,7 +201,9 @@ def _classify_block(block: List[dict], block_index: int, total_blocks: int) -> s
     
     # 5. Letter drill — single letters with diacritics
     if letter_count >= total * 0.5 or total >= 3:
-        diacritical_count = sum(1 for t in texts if has_diacritics(t) and count_chars(t) <= 2)
+        diacritical_count = sum(
+            1 for t, c in zip(texts, char_counts) if c <= 2 and has_diacritics(t)
+        )
         if diacritical_count >= total * 0.4:
             return 'letter_drill'
     
@@ -208,21 +222,18 @@ def _classify_block(block: List[dict], block_index: int, total_blocks: int) -> s
 
 # ─── Target letter extraction ──────────────────────────────
 
-def _extract_target_letter(block: List[dict], section_type: str) -> Optional[str]:
+def _extract_target_letter(
+    block: List[dict],
+    section_type: str,
+    letters: Dict[int, List[str]],
+) -> Optional[str]:
     """Extract dominant/target letter from a block via majority vote."""
     if section_type in ('opening_sentence', 'divider', 'alphabet_grid'):
         return None
     
-    all_letters = []
-    for u in block:
-        letters = extract_arabic_letters(u.get('text_content', ''))
-        all_letters.extend(letters)
-    
-    if not all_letters:
-        return None
-    
-    # Majority vote — most frequent letter
-    counter = Counter(all_letters)
+    # Majority vote — most frequent letter. Counter tallies the chained
+    # per-unit lists in C; no combined list is built.
+    counter = Counter(chain.from_iterable(letters[u['id']] for u in block))
     most_common = counter.most_common(1)
     if most_common:
         return most_common[0][0]
@@ -263,16 +274,21 @@ def auto_section_page(
     
     # Step 1: Y-axis segmentation
     blocks = _segment_by_y_axis(units, gap_threshold)
+
+    # Arabic letters of each unit, extracted once and shared by the
+    # classification and target-letter steps
+    letters = {u['id']: extract_arabic_letters(u.get('text_content', '')) for u in units}
     
     sections = []
     seen_unit_ids = set()
+    seen_count = 0
     
     for i, block in enumerate(blocks):
         # Step 2: Classify
-        section_type = _classify_block(block, i, len(blocks))
+        section_type = _classify_block(block, i, len(blocks), letters)
         
         # Step 3: Extract target letter
-        target_letter = _extract_target_letter(block, section_type)
+        target_letter = _extract_target_letter(block, section_type, letters)
         
         # Step 4: Generate titles
         title_ar, title_uz = _generate_titles(section_type, target_letter)
@@ -281,10 +297,12 @@ def auto_section_page(
         block_sorted = sorted(block, key=lambda u: u.get('sort_order', 0))
         unit_ids = [u['id'] for u in block_sorted]
         
-        # Fidelity check — no duplicates
-        for uid in unit_ids:
-            assert uid not in seen_unit_ids, f"Unit {uid} assigned to multiple sections"
-            seen_unit_ids.add(uid)
+        # Fidelity check — no duplicates (explicit raise: survives python -O)
+        if not seen_unit_ids.isdisjoint(unit_ids):
+            dup = next(uid for uid in unit_ids if uid in seen_unit_ids)
+            raise ValueError(f"Unit {dup} assigned to multiple sections")
+        seen_unit_ids.update(unit_ids)
+        seen_count += len(unit_ids)
         
         # Compute bounding box
         y_start = min(u['bbox_y'] for u in block)
@@ -303,11 +321,13 @@ def auto_section_page(
             'is_manual': False,
         })
     
-    # Final fidelity check — all units accounted for
-    all_unit_ids = {u['id'] for u in units}
-    assert seen_unit_ids == all_unit_ids, (
-        f"Unit loss detected: missing={all_unit_ids - seen_unit_ids}, "
-        f"extra={seen_unit_ids - all_unit_ids}"
-    )
+    # Final fidelity check — all units accounted for. Sections are built
+    # from the input units with no id repeated, so the counts must match.
+    if seen_count != len(units):
+        all_unit_ids = {u['id'] for u in units}
+        raise ValueError(
+            f"Unit loss detected: missing={all_unit_ids - seen_unit_ids}, "
+            f"extra={seen_unit_ids - all_unit_ids}"
+        )
     
     return sections
@@ -0,0 +1,50 @@
+"""SystemSettings rows as one cached key -> value dict.
+
+The map lives in Redis (cache.py helpers), so every API worker sees the
+same copy and an admin write invalidates it for all of them at once;
+SETTINGS_CACHE_TTL only bounds staleness if a delete is ever missed.
+Secrets (SECRET_KEYS) are left out of it and read from the database.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.system import SystemSettings
+from app.services.cache import cache_delete, cache_get, cache_set, dump_json
+
+logger = logging.getLogger("muallimi")
+
+SETTINGS_CACHE_TTL = 300  # seconds
+SETTINGS_KEY = "settings:public"
+
+# Never written to Redis in plaintext
+SECRET_KEYS = frozenset({"telegram_bot_token"})
+
+
+async def get_settings_map(db: AsyncSession) -> Dict[str, str]:
+    """Every non-secret setting's value by key; one SELECT on a cache miss."""
+    cached = await cache_get(SETTINGS_KEY)
+    if cached is not None:
+        return orjson.loads(cached)
+
+    result = await db.execute(
+        select(SystemSettings.key, SystemSettings.value)
+        .where(SystemSettings.key.not_in(SECRET_KEYS))
+    )
+    values = {key: value for key, value in result.all()}
+    await cache_set(SETTINGS_KEY, dump_json(values), ttl=SETTINGS_CACHE_TTL)
+    return values
+
+
+async def get_secret_setting(db: AsyncSession, key: str) -> Optional[str]:
+    """A SECRET_KEYS value, read from the database on every call."""
+    return await db.scalar(select(SystemSettings.value).where(SystemSettings.key == key))
+
+
+async def invalidate_settings() -> None:
+    """Drop the cached map; run after the writing transaction commits."""
+    await cache_delete(SETTINGS_KEY)
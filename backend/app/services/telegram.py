@@ -1,47 +1,120 @@
 """Telegram bot integration service."""
 
+import asyncio
 import logging
-from typing import Tuple
+import random
+from typing import Optional, Tuple
 
 import httpx
-from sqlalchemy import select
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.feedback import FeedbackSubmission
-from app.models.system import SystemSettings
+from app.services.settings_cache import get_secret_setting, get_settings_map
 
 logger = logging.getLogger("muallimi")
 
 TELEGRAM_API = "https://api.telegram.org"
-
-
-async def _get_telegram_config(db: AsyncSession) -> Tuple[str, list]:
+SEND_ATTEMPTS = 3  # 429 / 5xx responses are retried with backoff
+# Concurrent sends, under Telegram's ~30 messages/second bot limit
+_send_slots = asyncio.Semaphore(25)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared Telegram API client, created on first use.
+
+    Kept alive between sends so each notification reuses the pooled
+    connection instead of a fresh TCP + TLS handshake.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=TELEGRAM_API,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _send_message(token: str, payload: dict) -> httpx.Response:
+    """POST sendMessage, retrying rate limits and server errors.
+
+    Waits Telegram's retry_after on 429, otherwise exponential backoff with
+    jitter. The last response is returned whatever its status.
+    """
+    client = get_http_client()
+    # Encoded once with orjson (httpx's json= uses stdlib json) and reused
+    # across retries
+    body = orjson.dumps(payload)
+    async with _send_slots:
+        for attempt in range(SEND_ATTEMPTS):
+            response = await client.post(
+                f"/bot{token}/sendMessage",
+                content=body,
+                headers={"Content-Type": "application/json"},
+            )
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt == SEND_ATTEMPTS - 1:
+                break
+            delay = 2 ** attempt * 0.5 + random.uniform(0, 0.5)
+            if response.status_code == 429:
+                try:
+                    delay = float(response.json()["parameters"]["retry_after"])
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+    return response
+
+
+async def _send_to_chats(token: str, chat_ids: list, payload: dict) -> list:
+    """Send payload to every chat concurrently.
+
+    Returns, in chat_ids order, None for a delivered message or the error
+    text for a failed one.
+    """
+    async def _send_one(chat_id: str) -> Optional[str]:
+        try:
+            response = await _send_message(token, {"chat_id": chat_id, **payload})
+        except Exception as e:
+            return f"Xatolik: {str(e)}"
+        if response.status_code != 200:
+            return f"{response.status_code} {response.text}"
+        return None
+
+    return await asyncio.gather(*(_send_one(chat_id) for chat_id in chat_ids))
+
+
+async def get_telegram_config(db: AsyncSession) -> Tuple[str, list]:
     """Get Telegram bot token and chat IDs from database settings."""
-    result = await db.execute(
-        select(SystemSettings).where(SystemSettings.key == "telegram_bot_token")
-    )
-    token_setting = result.scalar_one_or_none()
-
-    result = await db.execute(
-        select(SystemSettings).where(SystemSettings.key == "telegram_chat_ids")
-    )
-    ids_setting = result.scalar_one_or_none()
+    values = await get_settings_map(db)
 
-    token = token_setting.value if token_setting else ""
+    # The token is a secret: not in the cached map
+    token = await get_secret_setting(db, "telegram_bot_token") or ""
     chat_ids = []
-    if ids_setting and ids_setting.value:
-        chat_ids = [cid.strip() for cid in ids_setting.value.split(",") if cid.strip()]
+    ids_value = values.get("telegram_chat_ids")
+    if ids_value:
+        chat_ids = [cid.strip() for cid in ids_value.split(",") if cid.strip()]
 
     return token, chat_ids
 
 
 async def send_feedback_to_telegram(
     feedback: FeedbackSubmission,
-    db: AsyncSession,
+    token: str,
+    chat_ids: list,
 ) -> bool:
-    """Send feedback notification to all configured Telegram chats."""
-    token, chat_ids = await _get_telegram_config(db)
-
+    """Send feedback notification to the chats from get_telegram_config()."""
     if not token or not chat_ids:
         logger.warning("Telegram not configured, skipping notification")
         return False
@@ -57,34 +130,19 @@ async def send_feedback_to_telegram(
         f"📅 {feedback.created_at.strftime('%Y-%m-%d %H:%M') if feedback.created_at else 'N/A'}"
     )
 
+    errors = await _send_to_chats(token, chat_ids, {"text": message, "parse_mode": "Markdown"})
     success = True
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for chat_id in chat_ids:
-            try:
-                response = await client.post(
-                    f"{TELEGRAM_API}/bot{token}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": message,
-                        "parse_mode": "Markdown",
-                    },
-                )
-                if response.status_code != 200:
-                    logger.error(
-                        f"Telegram send failed for chat {chat_id}: "
-                        f"{response.status_code} {response.text}"
-                    )
-                    success = False
-            except Exception as e:
-                logger.error(f"Telegram error for chat {chat_id}: {e}")
-                success = False
+    for chat_id, error in zip(chat_ids, errors):
+        if error:
+            logger.error(f"Telegram send failed for chat {chat_id}: {error}")
+            success = False
 
     return success
 
 
 async def test_telegram_connection(db: AsyncSession) -> Tuple[bool, str]:
     """Test Telegram bot connection by sending a test message."""
-    token, chat_ids = await _get_telegram_config(db)
+    token, chat_ids = await get_telegram_config(db)
 
     if not token:
         return False, "Bot token sozlanmagan"
@@ -93,23 +151,18 @@ async def test_telegram_connection(db: AsyncSession) -> Tuple[bool, str]:
 
     test_message = "✅ Muallimi Soniy — Telegram ulanishi muvaffaqiyatli!"
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for chat_id in chat_ids:
-            try:
-                response = await client.post(
-                    f"{TELEGRAM_API}/bot{token}/sendMessage",
-                    json={"chat_id": chat_id, "text": test_message},
-                )
-                if response.status_code != 200:
-                    return False, f"Chat {chat_id}: {response.text}"
-            except Exception as e:
-                return False, f"Xatolik: {str(e)}"
+    errors = await _send_to_chats(token, chat_ids, {"text": test_message})
+    for chat_id, error in zip(chat_ids, errors):
+        if error:
+            return False, f"Chat {chat_id}: {error}"
 
     return True, f"{len(chat_ids)} ta chatga muvaffaqiyatli yuborildi"
 
 
+# Markdown special characters, each prefixed with a backslash in one pass
+_MD_ESCAPES = str.maketrans({c: f"\\{c}" for c in "_*[]()~`>#+-=|{}.!"})
+
+
 def _escape_md(text: str) -> str:
     """Escape special Markdown characters."""
-    for char in ["_", "*", "[", "]", "(", ")", "~", "`", ">", "#", "+", "-", "=", "|", "{", "}", ".", "!"]:
-        text = text.replace(char, f"\\{char}")
-    return text
+    return text.translate(_MD_ESCAPES)
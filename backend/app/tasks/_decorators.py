@@ -0,0 +1,64 @@
+"""Shared failure handling for Celery tasks."""
+
+import functools
+import inspect
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.tasks.celery_app import get_sync_engine
+
+logger = logging.getLogger("muallimi")
+
+ERROR_MESSAGE_MAX = 500  # chars of the exception kept on the row
+
+
+def track_task(
+    model,
+    id_arg: str,
+    status_field: str,
+    error_field: str,
+    error_status,
+    on_error: Optional[Callable] = None,
+):
+    """Mark the task's row as failed once its retries are used up.
+
+    Wraps a ``bind=True`` task body. Attempts that RETRY_POLICY will retry
+    only log and re-raise; the final one also sets ``status_field`` to
+    ``error_status`` and ``error_field`` to the exception text on the
+    ``model`` row whose id is the task's ``id_arg`` argument, then calls
+    ``on_error(row)`` (e.g. to drop a cached listing).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception as e:
+                row_id = signature.bind(self, *args, **kwargs).arguments[id_arg]
+                logger.error(f"{self.name} failed for {model.__name__} {row_id}: {e}")
+                # autoretry_for raises the exception itself, not Retry, once
+                # request.retries reaches max_retries
+                if self.max_retries is not None and self.request.retries >= self.max_retries:
+                    _mark_failed(row_id, e)
+                raise
+
+        def _mark_failed(row_id, exc):
+            try:
+                with Session(get_sync_engine()) as db:
+                    row = db.get(model, row_id)
+                    if row:
+                        setattr(row, status_field, error_status)
+                        setattr(row, error_field, str(exc)[:ERROR_MESSAGE_MAX])
+                        db.commit()
+                        if on_error:
+                            on_error(row)
+            except Exception as mark_error:
+                logger.error(f"Could not mark {model.__name__} {row_id} as failed: {mark_error}")
+
+        return wrapper
+
+    return decorator
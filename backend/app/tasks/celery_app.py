@@ -1,11 +1,43 @@
 """Celery application configuration."""
 
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.config import get_settings
 
 settings = get_settings()
 
+_sync_engine = None
+
+
+def get_sync_engine():
+    """Sync SQLAlchemy engine shared by all tasks of this worker process.
+
+    Created on first use, so each forked worker process builds its own
+    pool (connections are never shared across a fork), then reused by
+    every later task instead of a new engine and connection per task.
+    """
+    global _sync_engine
+    if _sync_engine is None:
+        from sqlalchemy import create_engine
+        _sync_engine = create_engine(
+            settings.sync_database_url,
+            # A worker process runs one task at a time
+            pool_size=2,
+            max_overflow=3,
+            pool_pre_ping=True,
+        )
+    return _sync_engine
+
+
+@worker_process_init.connect
+def _reset_sync_engine(**kwargs):
+    """Drop a pool inherited from the parent process, if any was made."""
+    global _sync_engine
+    if _sync_engine is not None:
+        _sync_engine.dispose(close=False)
+        _sync_engine = None
+
 celery_app = Celery(
     "muallimi",
     broker=settings.CELERY_BROKER_URL,
@@ -27,7 +59,21 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     result_expires=3600,
+    # OCR runs on the worker-ocr service (-Q cpu, one process per core);
+    # everything else stays on the default queue
+    task_routes={"app.tasks.page_tasks.*": {"queue": "cpu"}},
 )
 
+# Shared by the tasks: any exception is retried with exponential backoff
+# (10 s, 20 s, 40 s ... capped at 10 min) and full jitter, so retries of a
+# failing dependency don't arrive in lockstep
+RETRY_POLICY = {
+    "autoretry_for": (Exception,),
+    "max_retries": 3,
+    "retry_backoff": 10,
+    "retry_backoff_max": 600,
+    "retry_jitter": True,
+}
+
 # Auto-discover tasks
 celery_app.autodiscover_tasks(["app.tasks"])
@@ -3,93 +3,94 @@
 import logging
 import os
 
-from app.tasks.celery_app import celery_app
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.tasks.celery_app import RETRY_POLICY, celery_app, get_sync_engine
+from app.tasks._decorators import track_task
 from app.config import get_settings
+from app.api.deps import UNIT_TYPE_MAP
+from app.models.book import Page, TextUnit, UnitType, PageStatus
+from app.services.image_analyzer import analyze_image
+from app.services.cache import cache_delete_sync, pages_key
 
 logger = logging.getLogger("muallimi")
 settings = get_settings()
 
 
-@celery_app.task(bind=True, max_retries=2, default_retry_delay=30)
+@celery_app.task(bind=True, **RETRY_POLICY)
+@track_task(
+    Page, "page_id", "analysis_status", "analysis_error", PageStatus.ERROR,
+    on_error=lambda page: cache_delete_sync(pages_key(page.book_id)),
+)
 def analyze_page_image_task(self, page_id: int, image_path: str):
     """Analyze a page image: run OCR and create text units.
 
     This runs in a Celery worker (sync context).
     Uses synchronous DB session.
     """
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import Session
-    from app.models.book import Book, Page, TextUnit, UnitType, PageStatus
-    from app.services.image_analyzer import analyze_image
-
-    engine = create_engine(settings.sync_database_url)
-
-    try:
-        with Session(engine) as db:
-            page = db.query(Page).filter(Page.id == page_id).first()
-            if not page:
-                logger.error(f"Page {page_id} not found")
-                return {"status": "error", "message": "Page not found"}
-
-            # Update status to analyzing
-            page.analysis_status = PageStatus.ANALYZING
+    engine = get_sync_engine()
+
+    with Session(engine) as db:
+        page = db.get(Page, page_id)
+        if not page:
+            logger.error(f"Page {page_id} not found")
+            return {"status": "error", "message": "Page not found"}
+
+        # Update status to analyzing
+        page.analysis_status = PageStatus.ANALYZING
+        db.commit()
+        cache_delete_sync(pages_key(page.book_id))
+
+        # Run image analysis
+        full_image_path = os.path.join(settings.MEDIA_DIR, image_path)
+        units = analyze_image(full_image_path)
+
+        if not units:
+            page.analysis_status = PageStatus.ERROR
+            page.analysis_error = "OCR dan hech qanday text topilmadi"
             db.commit()
-
-            # Run image analysis
-            full_image_path = os.path.join(settings.MEDIA_DIR, image_path)
-            units = analyze_image(full_image_path)
-
-            if not units:
-                page.analysis_status = PageStatus.ERROR
-                page.analysis_error = "OCR dan hech qanday text topilmadi"
-                db.commit()
-                return {"status": "error", "message": "No text found"}
-
-            # Delete existing draft units (if re-analyzing)
-            db.query(TextUnit).filter(
+            cache_delete_sync(pages_key(page.book_id))
+            return {"status": "error", "message": "No text found"}
+
+        # Delete existing draft units (if re-analyzing). No unit of this
+        # page is loaded in the session, so there is nothing to sync.
+        db.execute(
+            delete(TextUnit)
+            .where(
                 TextUnit.page_id == page_id,
                 TextUnit.is_manual == False
-            ).delete(synchronize_session='fetch')
-
-            # Create text unit records
-            from app.api.deps import UNIT_TYPE_MAP
-            for unit_data in units:
-                unit = TextUnit(
-                    page_id=page_id,
-                    unit_type=UNIT_TYPE_MAP.get(unit_data.unit_type, UnitType.WORD),
-                    text_content=unit_data.text,
-                    bbox_x=unit_data.bbox_x,
-                    bbox_y=unit_data.bbox_y,
-                    bbox_w=unit_data.bbox_w,
-                    bbox_h=unit_data.bbox_h,
-                    sort_order=unit_data.sort_order,
-                    confidence=unit_data.confidence,
-                    is_manual=False,
-                    metadata_=unit_data.metadata or {},
-                )
-                db.add(unit)
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-            page.analysis_status = PageStatus.DRAFT
-            page.has_text_data = True
-            page.analysis_error = None
-            db.commit()
-
-            logger.info(f"Page {page_id} analysis complete: {len(units)} units")
-            return {
-                "status": "success",
+        # Create text unit records (one multi-row INSERT)
+        db.execute(insert(TextUnit), [
+            {
                 "page_id": page_id,
-                "units_count": len(units),
+                "unit_type": UNIT_TYPE_MAP.get(unit_data.unit_type, UnitType.WORD),
+                "text_content": unit_data.text,
+                "bbox_x": unit_data.bbox_x,
+                "bbox_y": unit_data.bbox_y,
+                "bbox_w": unit_data.bbox_w,
+                "bbox_h": unit_data.bbox_h,
+                "sort_order": unit_data.sort_order,
+                "confidence": unit_data.confidence,
+                "is_manual": False,
+                "metadata_": unit_data.metadata or {},
             }
-
-    except Exception as e:
-        logger.error(f"Page analysis failed for page {page_id}: {e}")
-        try:
-            with Session(engine) as db:
-                page = db.query(Page).filter(Page.id == page_id).first()
-                if page:
-                    page.analysis_status = PageStatus.ERROR
-                    page.analysis_error = str(e)
-                    db.commit()
-        except Exception:
-            pass
-        self.retry(exc=e)
+            for unit_data in units
+        ])
+
+        page.analysis_status = PageStatus.DRAFT
+        page.has_text_data = True
+        page.analysis_error = None
+        db.commit()
+        cache_delete_sync(pages_key(page.book_id))
+
+        logger.info(f"Page {page_id} analysis complete: {len(units)} units")
+        return {
+            "status": "success",
+            "page_id": page_id,
+            "units_count": len(units),
+        }
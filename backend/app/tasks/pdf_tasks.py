@@ -3,92 +3,109 @@
 import logging
 import os
 
-from app.tasks.celery_app import celery_app
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.tasks.celery_app import RETRY_POLICY, celery_app, get_sync_engine
 from app.config import get_settings
+from app.models.book import Book, Page, TextUnit, UnitType
+from app.services.pdf_import import render_pdf_pages, extract_all_text_units
+from app.services.cache import cache_delete_sync, pages_key
 
 logger = logging.getLogger("muallimi")
 settings = get_settings()
 
 
-@celery_app.task(bind=True, max_retries=2, default_retry_delay=30)
+@celery_app.task(bind=True, **RETRY_POLICY)
 def process_pdf_task(self, pdf_path: str):
     """Process uploaded PDF: render pages + extract text."""
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import Session
-    from app.database import Base
-    from app.models.book import Book, Page, TextUnit, UnitType
-    from app.services.pdf_import import render_pdf_pages, extract_text_units
+    engine = get_sync_engine()
 
-    engine = create_engine(settings.sync_database_url)
+    # Render pages
+    output_dir = os.path.join(settings.MEDIA_DIR, "pages")
+    pages_info = render_pdf_pages(pdf_path, output_dir)
+    # One pdfplumber parse for the whole document, not one per page
+    pages_units = extract_all_text_units(pdf_path)
 
-    try:
-        # Render pages
-        output_dir = os.path.join(settings.MEDIA_DIR, "pages")
-        pages_info = render_pdf_pages(pdf_path, output_dir)
+    with Session(engine) as db:
+        # Create or get book
+        book = db.query(Book).first()
+        if not book:
+            book = Book(
+                title="Muallimi Soniy",
+                description="Ahmad Xodiy Maqsudiy — Muallimi Soniy (Ikkinchi Muallim)",
+                author="Ahmad Xodiy Maqsudiy",
+                total_pages=len(pages_info),
+            )
+            db.add(book)
+            db.flush()
+        else:
+            book.total_pages = len(pages_info)
 
-        with Session(engine) as db:
-            # Create or get book
-            book = db.query(Book).first()
-            if not book:
-                book = Book(
-                    title="Muallimi Soniy",
-                    description="Ahmad Xodiy Maqsudiy — Muallimi Soniy (Ikkinchi Muallim)",
-                    author="Ahmad Xodiy Maqsudiy",
-                    total_pages=len(pages_info),
+        # Existing pages of the book, loaded in one query
+        existing_pages = {
+            page.page_number: page
+            for page in db.scalars(
+                select(Page).where(
+                    Page.book_id == book.id,
+                    Page.page_number.in_([p["page_number"] for p in pages_info]),
                 )
-                db.add(book)
-                db.flush()
-            else:
-                book.total_pages = len(pages_info)
+            )
+        }
 
-            # Create page records
-            for pinfo in pages_info:
-                existing = db.query(Page).filter(
-                    Page.book_id == book.id,
-                    Page.page_number == pinfo["page_number"]
-                ).first()
+        # Create page records
+        page_units = []
+        for pinfo in pages_info:
+            existing = existing_pages.get(pinfo["page_number"])
 
-                if existing:
-                    existing.image_path = pinfo["image_path"]
-                    existing.image_2x_path = pinfo["image_2x_path"]
-                    existing.image_width = pinfo["width"]
-                    existing.image_height = pinfo["height"]
-                    page = existing
-                else:
-                    page = Page(
-                        book_id=book.id,
-                        page_number=pinfo["page_number"],
-                        image_path=pinfo["image_path"],
-                        image_2x_path=pinfo["image_2x_path"],
-                        image_width=pinfo["width"],
-                        image_height=pinfo["height"],
-                    )
-                    db.add(page)
-                    db.flush()
+            if existing:
+                existing.image_path = pinfo["image_path"]
+                existing.image_2x_path = pinfo["image_2x_path"]
+                existing.image_width = pinfo["width"]
+                existing.image_height = pinfo["height"]
+                page = existing
+            else:
+                page = Page(
+                    book_id=book.id,
+                    page_number=pinfo["page_number"],
+                    image_path=pinfo["image_path"],
+                    image_2x_path=pinfo["image_2x_path"],
+                    image_width=pinfo["width"],
+                    image_height=pinfo["height"],
+                )
+                db.add(page)
 
-                # Try extracting text units
-                units = extract_text_units(pdf_path, pinfo["page_number"])
-                if units:
-                    page.has_text_data = True
-                    for uinfo in units:
-                        text_unit = TextUnit(
-                            page_id=page.id,
-                            unit_type=UnitType(uinfo["unit_type"]),
-                            text_content=uinfo["text_content"],
-                            bbox_x=uinfo["bbox_x"],
-                            bbox_y=uinfo["bbox_y"],
-                            bbox_w=uinfo["bbox_w"],
-                            bbox_h=uinfo["bbox_h"],
-                            sort_order=uinfo["sort_order"],
-                            is_manual=False,
-                        )
-                        db.add(text_unit)
+            # Try extracting text units
+            page_index = pinfo["page_number"] - 1
+            units = pages_units[page_index] if page_index < len(pages_units) else []
+            if units:
+                page.has_text_data = True
+                page_units.append((page, units))
 
-            db.commit()
-            logger.info(f"PDF processing complete: {len(pages_info)} pages")
+        # One flush inserts all new pages (batched INSERT ... RETURNING)
+        # and assigns the ids the unit rows need
+        db.flush()
+        unit_rows = [
+            {
+                "page_id": page.id,
+                "unit_type": UnitType(uinfo["unit_type"]),
+                "text_content": uinfo["text_content"],
+                "bbox_x": uinfo["bbox_x"],
+                "bbox_y": uinfo["bbox_y"],
+                "bbox_w": uinfo["bbox_w"],
+                "bbox_h": uinfo["bbox_h"],
+                "sort_order": uinfo["sort_order"],
+                "is_manual": False,
+            }
+            for page, units in page_units
+            for uinfo in units
+        ]
 
-        return {"status": "success", "pages": len(pages_info)}
+        # All pages' units in one multi-row INSERT
+        if unit_rows:
+            db.execute(insert(TextUnit), unit_rows)
+        db.commit()
+        cache_delete_sync(pages_key(book.id))
+        logger.info(f"PDF processing complete: {len(pages_info)} pages")
 
-    except Exception as e:
-        logger.error(f"PDF processing failed: {e}")
-        self.retry(exc=e)
+    return {"status": "success", "pages": len(pages_info)}
@@ -1,5 +1,7 @@
 """Security utilities: password hashing and JWT token management."""
 
+import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -12,6 +14,15 @@ settings = get_settings()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified token payloads: token -> (exp timestamp, payload).
+# Only successful decodes are stored, so bad tokens are always re-checked.
+_TOKEN_CACHE_MAX = 1024
+_token_cache: dict[str, tuple[float, dict]] = {}
+
+# HMAC (HS*) verification is cheap enough to run on the event loop;
+# RSA/EC signatures are not and get pushed to a worker thread.
+_JWT_IS_ASYMMETRIC = not settings.JWT_ALGORITHM.upper().startswith("HS")
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -38,3 +49,43 @@ def decode_access_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def _cached_token_payload(token: str, now: float) -> Optional[dict]:
+    cached = _token_cache.get(token)
+    if cached is not None:
+        if cached[0] > now:
+            return cached[1]
+        _token_cache.pop(token, None)
+    return None
+
+
+def decode_access_token_cached(token: str) -> Optional[dict]:
+    """Decode a JWT, reusing the payload of an already verified token until it expires."""
+    now = time.time()
+    payload = _cached_token_payload(token, now)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    if exp is not None and exp > now:
+        if len(_token_cache) >= _TOKEN_CACHE_MAX:
+            # Evict the oldest entry (dicts keep insertion order)
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[token] = (float(exp), payload)
+    return payload
+
+
+async def decode_access_token_async(token: str) -> Optional[dict]:
+    """Event-loop friendly decode: cache hits and HMAC tokens run inline,
+    asymmetric signature checks run in a worker thread."""
+    payload = _cached_token_payload(token, time.time())
+    if payload is not None:
+        return payload
+    if _JWT_IS_ASYMMETRIC:
+        return await asyncio.to_thread(decode_access_token_cached, token)
+    return decode_access_token_cached(token)
@@ -0,0 +1,38 @@
+"""Helpers for Alembic data migrations on large tables."""
+
+from typing import Iterator, List
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+# Rows per batch for data migrations (pages, text_units, ...)
+MIGRATION_BATCH_SIZE = 200
+
+
+def iter_id_batches(
+    connection: Connection,
+    table: sa.Table,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+) -> Iterator[List[int]]:
+    """Yield ascending batches of primary-key ids using keyset paging.
+
+    Only ids are held in memory, one batch at a time. Typical use inside
+    a migration's upgrade():
+
+        ctx = op.get_context()
+        for ids in iter_id_batches(op.get_bind(), text_units):
+            with ctx.autocommit_block():
+                op.execute(text_units.update().where(text_units.c.id.in_(ids))...)
+    """
+    last_id = 0
+    while True:
+        ids = connection.execute(
+            sa.select(table.c.id)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return
+        yield list(ids)
+        last_id = ids[-1]
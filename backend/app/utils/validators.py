@@ -3,11 +3,16 @@
 import re
 from typing import Optional
 
+# Compiled once at import; validate_phone runs on every feedback POST
+_PHONE_SEPARATORS_RE = re.compile(r"[\s\-\(\)]")
+_PHONE_RE = re.compile(r"^\+?[0-9]{7,15}$")
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\-\.]")
+
 
 def validate_phone(phone: str) -> Optional[str]:
     """Validate and clean phone number. Returns cleaned number or None."""
-    cleaned = re.sub(r"[\s\-\(\)]", "", phone)
-    if re.match(r"^\+?[0-9]{7,15}$", cleaned):
+    cleaned = _PHONE_SEPARATORS_RE.sub("", phone)
+    if _PHONE_RE.match(cleaned):
         return cleaned
     return None
 
@@ -20,5 +25,19 @@ def validate_file_extension(filename: str, allowed: list[str]) -> bool:
 
 def sanitize_filename(filename: str) -> str:
     """Remove potentially dangerous characters from filename."""
-    name = re.sub(r"[^\w\-\.]", "_", filename)
+    name = _UNSAFE_FILENAME_RE.sub("_", filename)
     return name[:200]
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Detect PNG/JPEG/WEBP from the first 12 bytes of a file.
+
+    Returns "png", "jpeg", "webp" or None.
+    """
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if head[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
@@ -11,33 +11,36 @@ from sqlalchemy import select, func, update
 
 async def migrate():
     async with AsyncSessionLocal() as db:
-        # First show current state
+        # First show current state (one aggregate row per layout type)
         result = await db.execute(
-            select(Page.page_number, Page.layout_type)
-            .order_by(Page.page_number)
+            select(Page.layout_type, func.count())
+            .group_by(Page.layout_type)
+            .order_by(Page.layout_type)
         )
-        rows = result.all()
-        print(f"Total pages: {len(rows)}")
-        for r in rows:
-            print(f"  Page {r[0]}: layout={r[1]}")
+        histogram = result.all()
+        print(f"Total pages: {sum(n for _, n in histogram)}")
+        for layout, n in histogram:
+            print(f"  layout={layout}: {n} pages")
 
-        # Count text_units per page
-        result2 = await db.execute(
+        # Count text_units per page, streamed from a server-side cursor
+        rows = await db.stream(
             select(Page.page_number, func.count(TextUnit.id))
             .join(TextUnit, TextUnit.page_id == Page.id, isouter=True)
             .group_by(Page.page_number)
             .order_by(Page.page_number)
         )
-        counts = result2.all()
         print("\n--- Text Units per Page ---")
-        for r in counts:
-            print(f"  Page {r[0]}: {r[1]} units")
+        async for page_number, units in rows:
+            print(f"  Page {page_number}: {units} units")
 
-        # Set all pages to native
-        await db.execute(
-            update(Page).values(layout_type='native')
+        # Set all pages to native (rows already native are left untouched)
+        result = await db.execute(
+            update(Page)
+            .where(Page.layout_type != 'native')
+            .values(layout_type='native')
+            .execution_options(synchronize_session=False)
         )
         await db.commit()
-        print("\n✅ All pages set to layout_type='native'")
+        print(f"\n✅ All pages set to layout_type='native' ({result.rowcount} updated)")
 
 asyncio.run(migrate())
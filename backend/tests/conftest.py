@@ -0,0 +1,67 @@
+"""Shared fixtures: the app over ASGI, an admin token, a scratch page.
+
+Run inside the api container (``make test``) — the tests talk to the
+compose Postgres and Redis, and clean up the rows they create.
+"""
+
+import random
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models.admin import AdminUser
+from app.models.book import Book, Page, TextUnit
+from app.services import cache
+from app.services.cache import pages_key
+from app.utils import create_access_token
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _fresh_connections():
+    """Pools and clients belong to one event loop; each test gets its own."""
+    yield
+    await engine.dispose()
+    if cache._redis is not None:
+        await cache._redis.aclose()
+        cache._redis = None
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest_asyncio.fixture
+async def admin_headers():
+    async with AsyncSessionLocal() as db:
+        admin = await db.scalar(select(AdminUser).limit(1))
+    if admin is None:
+        pytest.skip("no admin user (seed has not run)")
+    token = create_access_token({"sub": admin.username, "uid": admin.id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture
+async def page():
+    """An empty page on the book, removed (with its units) afterwards."""
+    async with AsyncSessionLocal() as db:
+        book = await db.scalar(select(Book).limit(1))
+        if book is None:
+            pytest.skip("no book (seed has not run)")
+        page = Page(book_id=book.id, page_number=random.randint(90_000, 99_999))
+        db.add(page)
+        await db.commit()
+
+    yield page
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(TextUnit).where(TextUnit.page_id == page.id))
+        await db.execute(delete(Page).where(Page.id == page.id))
+        await db.commit()
+    await cache.cache_delete(pages_key(page.book_id))
@@ -0,0 +1,100 @@
+"""cut_all_segments: which piece of the source ends up at which output path.
+
+FFmpeg is replaced by a fake that writes, into every file it would
+produce, the time range that file covers.
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from app.services import audio_processor
+from app.services.audio_processor import cut_all_segments
+
+
+class FakeFFmpeg:
+    def __init__(self, segment_muxer_ok=True):
+        self.segment_muxer_ok = segment_muxer_ok
+        self.segment_times = None
+        self.single_cuts = []
+
+    def __call__(self, cmd, **kwargs):
+        if "-segment_times" in cmd:
+            self.segment_times = cmd[cmd.index("-segment_times") + 1]
+            if not self.segment_muxer_ok:
+                return subprocess.CompletedProcess(cmd, 1, "", "muxer failed")
+            times = self.segment_times.split(",")
+            edges = ["0.000"] + times + ["end"]
+            pattern = cmd[-1]
+            for i in range(len(times) + 1):
+                with open(pattern % i, "w") as f:
+                    f.write(f"{edges[i]}-{edges[i + 1]}")
+        else:
+            start = cmd[cmd.index("-ss") + 1]
+            duration = cmd[cmd.index("-t") + 1]
+            self.single_cuts.append((start, duration))
+            with open(cmd[-1], "w") as f:
+                f.write(f"{start}+{duration}")
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    fake = FakeFFmpeg()
+    monkeypatch.setattr(audio_processor.subprocess, "run", fake)
+    return fake
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _cuts(tmp_path, spans):
+    return [(str(tmp_path / f"seg_{i}.mp3"), start, end) for i, (start, end) in enumerate(spans)]
+
+
+def test_segment_muxer_maps_bounds_to_pieces(tmp_path, ffmpeg):
+    # Gaps between segments (silence) and a segment ending where the next starts
+    cuts = _cuts(tmp_path, [(500, 1200), (1200, 2000), (3000, 4500)])
+
+    assert cut_all_segments("source.mp3", cuts) == [True, True, True]
+    assert ffmpeg.segment_times == "0.500,1.200,2.000,3.000,4.500"
+    assert [_read(path) for path, _, _ in cuts] == [
+        "0.500-1.200", "1.200-2.000", "3.000-4.500",
+    ]
+    # The gap pieces and the work directory are cleaned up
+    assert sorted(os.listdir(tmp_path)) == ["seg_0.mp3", "seg_1.mp3", "seg_2.mp3"]
+
+
+def test_segment_muxer_with_unordered_cuts_and_start_at_zero(tmp_path, ffmpeg):
+    cuts = _cuts(tmp_path, [(2000, 2500), (0, 800)])
+
+    assert cut_all_segments("source.mp3", cuts) == [True, True]
+    # 0 is never a split point: piece 0 already starts there
+    assert ffmpeg.segment_times == "0.800,2.000,2.500"
+    assert [_read(path) for path, _, _ in cuts] == ["2.000-2.500", "0.000-0.800"]
+
+
+def test_failed_muxer_falls_back_to_one_cut_per_segment(tmp_path, monkeypatch):
+    fake = FakeFFmpeg(segment_muxer_ok=False)
+    monkeypatch.setattr(audio_processor.subprocess, "run", fake)
+    cuts = _cuts(tmp_path, [(500, 1200), (3000, 4500)])
+
+    assert cut_all_segments("source.mp3", cuts) == [True, True]
+    assert sorted(fake.single_cuts) == [("0.5", "0.7"), ("3.0", "1.5")]
+    assert [_read(path) for path, _, _ in cuts] == ["0.5+0.7", "3.0+1.5"]
+
+
+def test_overlapping_cuts_skip_the_muxer(tmp_path, ffmpeg):
+    cuts = _cuts(tmp_path, [(0, 1500), (1000, 2000)])
+
+    assert cut_all_segments("source.mp3", cuts) == [True, True]
+    assert ffmpeg.segment_times is None
+    assert [_read(path) for path, _, _ in cuts] == ["0.0+1.5", "1.0+1.0"]
+
+
+def test_no_cuts(ffmpeg):
+    assert cut_all_segments("source.mp3", []) == []
+    assert ffmpeg.segment_times is None
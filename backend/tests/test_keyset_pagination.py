@@ -0,0 +1,64 @@
+"""Audit-log keyset pagination across rows sharing one created_at."""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, insert
+
+from app.database import AsyncSessionLocal
+from app.models.system import AuditLog
+from app.utils.pagination import decode_cursor
+
+AUDIT_URL = "/api/v1/admin/audit-log"
+TIED_AT = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+async def _insert_logs(action: str, count: int) -> list[int]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            insert(AuditLog).returning(AuditLog.id),
+            [{"action": action, "created_at": TIED_AT} for _ in range(count)],
+        )
+        ids = list(result.scalars())
+        await db.commit()
+    return ids
+
+
+@pytest_asyncio.fixture
+async def action():
+    """A unique action name, so the listing only holds this test's rows."""
+    name = f"test-keyset-{uuid.uuid4().hex[:8]}"
+    yield name
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AuditLog).where(AuditLog.action == name))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_pages_through_tied_timestamps(client, admin_headers, action):
+    ids = await _insert_logs(action, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"action": action, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(AUDIT_URL, headers=admin_headers, params=params)
+        assert response.status_code == 200
+        rows = response.json()
+        seen.extend(row["id"] for row in rows)
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        # The header points at the body's last row
+        assert decode_cursor(cursor)[1] == rows[-1]["id"]
+
+        # Rows landing while paging (same timestamp, higher ids) sort ahead
+        # of the cursor and must not shift the pages still to come
+        await _insert_logs(action, 2)
+
+    assert seen == sorted(ids, reverse=True)
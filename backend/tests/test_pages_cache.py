@@ -0,0 +1,39 @@
+"""The cached admin pages list must not outlive a write."""
+
+import pytest
+
+from app.api.v1.admin import book as book_api
+
+PAGES_URL = "/api/v1/admin/book/pages"
+
+
+def _unit_count(response, page_id: int) -> int:
+    return next(p["unit_count"] for p in response.json() if p["id"] == page_id)
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_sees_new_unit(client, admin_headers, page, monkeypatch):
+    # Warm the cache with the empty page
+    response = await client.get(PAGES_URL, headers=admin_headers)
+    assert _unit_count(response, page.id) == 0
+
+    # An admin GET landing right as the key is dropped. If the delete ran
+    # before get_db committed, this read would see the old rows and put
+    # them back in the cache.
+    real_delete = book_api.cache_delete
+
+    async def delete_then_read(*keys):
+        await real_delete(*keys)
+        await client.get(PAGES_URL, headers=admin_headers)
+
+    monkeypatch.setattr(book_api, "cache_delete", delete_then_read)
+    response = await client.post(
+        f"/api/v1/admin/book/pages/{page.id}/units",
+        headers=admin_headers,
+        json={"text_content": "ب", "bbox_x": 10, "bbox_y": 10, "bbox_w": 5, "bbox_h": 5},
+    )
+    assert response.status_code == 201
+    monkeypatch.undo()
+
+    response = await client.get(PAGES_URL, headers=admin_headers)
+    assert _unit_count(response, page.id) == 1
@@ -0,0 +1,107 @@
+"""check_overlaps (grid buckets) against the pairwise scan it replaced."""
+
+import random
+
+import pytest
+
+from app.services.qa_checker import OVERLAP_CELL, check_overlaps
+
+
+def _pairwise_overlaps(units):
+    """The original O(n²) check, kept as the reference."""
+    overlaps = []
+    for i, u1 in enumerate(units):
+        for j, u2 in enumerate(units):
+            if i >= j:
+                continue
+            x1, y1, w1, h1 = u1.get("bbox_x", 0), u1.get("bbox_y", 0), u1.get("bbox_w", 0), u1.get("bbox_h", 0)
+            x2, y2, w2, h2 = u2.get("bbox_x", 0), u2.get("bbox_y", 0), u2.get("bbox_w", 0), u2.get("bbox_h", 0)
+            if w1 == 0 or w2 == 0:
+                continue
+
+            overlap_x = max(0, min(x1 + w1, x2 + w2) - max(x1, x2))
+            overlap_y = max(0, min(y1 + h1, y2 + h2) - max(y1, y2))
+            overlap_area = overlap_x * overlap_y
+
+            area1 = w1 * h1
+            area2 = w2 * h2
+            min_area = min(area1, area2) if min(area1, area2) > 0 else 1
+
+            if overlap_area / min_area > 0.3:
+                overlaps.append({
+                    "unit_a": u1.get("sort_order", i),
+                    "unit_b": u2.get("sort_order", j),
+                    "overlap_ratio": round(overlap_area / min_area, 2),
+                })
+    return overlaps
+
+
+def _unit(i, x, y, w, h):
+    return {"sort_order": i, "bbox_x": x, "bbox_y": y, "bbox_w": w, "bbox_h": h}
+
+
+def _assert_same(units):
+    expected = _pairwise_overlaps(units)
+    result = check_overlaps(units)
+    assert result["passed"] == (not expected)
+    assert result["details"]["overlaps"] == expected[:10]
+    assert result["message"] == (
+        f"{len(expected)} ta overlap topildi" if expected else "Overlap yo'q"
+    )
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_pairwise_on_random_boxes(seed):
+    rng = random.Random(seed)
+    # Half-unit grid: many boxes start or end exactly on a cell edge,
+    # touch each other edge to edge, or have zero width/height
+    step = 0.5
+    units = [
+        _unit(
+            i,
+            rng.randint(0, 190) * step,
+            rng.randint(0, 190) * step,
+            rng.randint(0, 40) * step,
+            rng.randint(0, 40) * step,
+        )
+        for i in range(rng.randint(0, 40))
+    ]
+    _assert_same(units)
+
+
+def test_box_straddling_cells():
+    # Both boxes span several cells; they share only the cell at (1, 1)
+    units = [
+        _unit(0, OVERLAP_CELL - 2, OVERLAP_CELL - 2, 2 * OVERLAP_CELL, 2 * OVERLAP_CELL),
+        _unit(1, OVERLAP_CELL + 1, OVERLAP_CELL + 1, 3, 3),
+    ]
+    _assert_same(units)
+    assert not check_overlaps(units)["passed"]
+
+
+def test_edges_touching_exactly():
+    # Side by side on a cell boundary: zero overlap area
+    units = [
+        _unit(0, 0, 0, OVERLAP_CELL, 5),
+        _unit(1, OVERLAP_CELL, 0, OVERLAP_CELL, 5),
+    ]
+    _assert_same(units)
+    assert check_overlaps(units)["passed"]
+
+
+def test_zero_size_boxes():
+    units = [
+        _unit(0, 5, 5, 0, 10),
+        _unit(1, 5, 5, 10, 0),
+        _unit(2, 5, 5, 10, 10),
+        _unit(3, 5, 5, 10, 10),
+    ]
+    _assert_same(units)
+    assert check_overlaps(units)["details"]["overlaps"] == [
+        {"unit_a": 2, "unit_b": 3, "overlap_ratio": 1.0},
+    ]
+
+
+def test_more_than_ten_overlaps_keeps_the_first_ten():
+    units = [_unit(i, 1, 1, 5, 5) for i in range(6)]  # 15 pairs
+    _assert_same(units)
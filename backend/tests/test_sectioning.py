@@ -0,0 +1,69 @@
+"""Y-axis segmentation and the auto-sectioning fidelity checks."""
+
+import pytest
+
+from app.services.sectioning import _segment_by_y_axis, auto_section_page
+
+
+def _unit(uid, y, h=2.0, unit_type="letter", text="بَ"):
+    return {
+        "id": uid, "unit_type": unit_type, "text_content": text,
+        "bbox_x": 10.0, "bbox_y": y, "bbox_w": 5.0, "bbox_h": h, "sort_order": uid,
+    }
+
+
+def _ids(blocks):
+    return [[u["id"] for u in block] for block in blocks]
+
+
+def test_no_units():
+    assert _segment_by_y_axis([]) == []
+
+
+def test_single_block():
+    units = [_unit(1, 10), _unit(2, 12.5), _unit(3, 15)]
+    assert _ids(_segment_by_y_axis(units)) == [[1, 2, 3]]
+
+
+def test_gaps_without_dividers():
+    units = [_unit(1, 10), _unit(2, 12), _unit(3, 30), _unit(4, 60)]
+    assert _ids(_segment_by_y_axis(units, gap_threshold=5.0)) == [[1, 2], [3], [4]]
+
+
+def test_unsorted_input():
+    units = [_unit(3, 30), _unit(1, 10), _unit(2, 12)]
+    assert _ids(_segment_by_y_axis(units)) == [[1, 2], [3]]
+
+
+def test_divider_gets_its_own_block():
+    units = [_unit(1, 10), _unit(2, 13, unit_type="divider"), _unit(3, 15)]
+    assert _ids(_segment_by_y_axis(units)) == [[1], [2], [3]]
+
+
+def test_gap_right_after_divider_leaves_no_empty_block():
+    # The divider empties the current block; a gap before the next unit
+    # used to append that empty block (and crash auto_section_page)
+    units = [_unit(1, 10), _unit(2, 13, unit_type="divider"), _unit(3, 40)]
+    blocks = _segment_by_y_axis(units)
+    assert _ids(blocks) == [[1], [2], [3]]
+    assert all(blocks)
+
+
+def test_divider_last():
+    units = [_unit(1, 10), _unit(2, 13, unit_type="divider")]
+    assert _ids(_segment_by_y_axis(units)) == [[1], [2]]
+
+
+def test_auto_section_keeps_every_unit_once():
+    units = [_unit(1, 10), _unit(2, 13, unit_type="divider"), _unit(3, 40), _unit(4, 42)]
+    sections = auto_section_page(7, units)
+    assert [s["unit_ids"] for s in sections] == [[1], [2], [3, 4]]
+    assert sections[1]["section_type"] == "divider"
+    assert all(s["page_id"] == 7 for s in sections)
+
+
+def test_auto_section_rejects_duplicate_unit_ids():
+    # Raised explicitly (not assert), so it holds under python -O
+    units = [_unit(1, 10), _unit(1, 40)]
+    with pytest.raises(ValueError, match="multiple sections"):
+        auto_section_page(7, units)
@@ -38,4 +38,4 @@ if [ $# -ge 2 ]; then
 fi
 
 echo "=== Restore completed ==="
-echo "Restart services: docker compose restart api worker"
+echo "Restart services: docker compose restart api worker worker-ocr"